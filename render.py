@@ -0,0 +1,983 @@
+#!/usr/bin/env python3
+# Renders every scene in parallel and stitches them into one video, in script
+# order. Replaces the list of `manim -qk` lines that used to live in
+# render.sh, e.g.
+#
+#   ./render.py                      # every scene, 4K, one worker per core
+#   ./render.py -ql --workers 4      # low quality preview
+#   ./render.py DAGScene AlgorithmA  # just these, no stitching
+#   ./render.py --no-cache           # render everything again
+#
+# Each scene is rendered by its own manim process (manim's config is global,
+# so scenes cannot share one) with its own media directory, so partial movie
+# files never collide. Wall time is bounded by the slowest scene rather than
+# by the sum of all of them, given enough workers.
+#
+# Rendered videos are cached by a hash of everything the scene depends on
+# (see scene_fingerprint), so unchanged scenes are not rendered again, and
+# the scenes' TeX is compiled once, in parallel, before rendering starts (see
+# prewarm_tex).
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+ROOT = os.path.dirname(os.path.realpath(__file__))
+
+# In script order.
+SCENE_FILES = ["scenes/introduction.py", "scenes/algorithm-a.py"]
+
+QUALITIES = {
+    "l": "480p15",
+    "m": "720p30",
+    "h": "1080p60",
+    "p": "1440p60",
+    "k": "2160p60",
+}
+
+
+class SceneJob:
+    def __init__(self, path: str, name: str, index: int):
+        self.path = path
+        self.name = name
+        self.index = index
+
+    def __repr__(self):
+        return f"{self.path}:{self.name}"
+
+
+# Every Scene subclass defined in `paths`, in the order they appear. Found by
+# parsing rather than importing, so discovery does not pay for importing
+# manim. A class is a scene if one of its bases is named like a manim scene
+# (Scene, MovingCameraScene, ...) or is itself a scene found earlier. Scenes
+# that other scenes in the same file derive from are templates (such as
+# CoffmanGrahamScheduleScene, which has no graph of its own) and are skipped.
+def discover_scenes(paths=SCENE_FILES) -> list:
+    jobs = []
+    for path in paths:
+        with open(os.path.join(ROOT, path)) as f:
+            tree = ast.parse(f.read(), filename=path)
+
+        scenes, templates = [], set()
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for base in node.bases:
+                if isinstance(base, ast.Attribute):
+                    name = base.attr
+                else:
+                    name = getattr(base, "id", "")
+                if name in scenes:
+                    templates.add(name)
+                if name.endswith("Scene") or name in scenes:
+                    scenes.append(node.name)
+                    break
+        for name in scenes:
+            if name not in templates:
+                jobs.append(SceneJob(path, name, len(jobs)))
+    return jobs
+
+
+def scene_media_dir(media_dir: str, job: SceneJob) -> str:
+    module = os.path.splitext(os.path.basename(job.path))[0]
+    return os.path.join(media_dir, "scenes", f"{module}.{job.name}")
+
+
+# The video manim wrote for `job`, e.g.
+# <scene media dir>/videos/algorithm-a/2160p60/AlgorithmA.mp4.
+def scene_video(media_dir: str, job: SceneJob, quality: str):
+    module = os.path.splitext(os.path.basename(job.path))[0]
+    video = os.path.join(
+        scene_media_dir(media_dir, job),
+        "videos",
+        module,
+        QUALITIES[quality],
+        f"{job.name}.mp4",
+    )
+    return video if os.path.exists(video) else None
+
+
+# Renders one scene with its own manim process and media directory. Runs from
+# the repository root, since scenes load resources/ by relative path. Returns
+# (job, seconds, video or None); manim's output goes to render.log next to the
+# scene's media.
+#
+# With a shared `tex_dir`, the render still gets a tex_dir of its own, seeded
+# with links to every SVG in the shared one: manim writes a scratch file next
+# to each SVG it reads and deletes every .dvi and .log in its tex_dir after a
+# compile, so concurrent renders cannot safely share one directory. SVGs the
+# render compiled itself are published back into `tex_dir` afterwards.
+def render_scene(
+    job: SceneJob,
+    quality: str,
+    media_dir: str,
+    manim: str = "manim",
+    tex_dir=None,
+):
+    scene_dir = scene_media_dir(media_dir, job)
+    os.makedirs(scene_dir, exist_ok=True)
+    command = [
+        *manim.split(),
+        "render",
+        f"-q{quality}",
+        "--media_dir",
+        scene_dir,
+    ]
+    if tex_dir is not None:
+        scene_tex_dir = os.path.join(scene_dir, "Tex")
+        os.makedirs(scene_tex_dir, exist_ok=True)
+        for name in _tex_svgs(tex_dir) - _tex_svgs(scene_tex_dir):
+            _publish_svg(os.path.join(tex_dir, name), scene_tex_dir)
+        command += ["--config_file", write_tex_config(scene_dir, scene_tex_dir)]
+    command += [job.path, job.name]
+
+    start = time.perf_counter()
+    with open(os.path.join(scene_dir, "render.log"), "w") as log:
+        result = subprocess.run(
+            command, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT
+        )
+    seconds = time.perf_counter() - start
+
+    if tex_dir is not None:
+        for name in _tex_svgs(scene_tex_dir) - _tex_svgs(tex_dir):
+            _publish_svg(os.path.join(scene_tex_dir, name), tex_dir)
+
+    if result.returncode != 0:
+        return job, seconds, None
+    return job, seconds, scene_video(media_dir, job, quality)
+
+
+# Joins `videos` with ffmpeg's concat demuxer. The scenes share a codec and
+# resolution, so the streams are copied rather than re-encoded.
+def stitch(videos: list, output: str, ffmpeg: str = "ffmpeg"):
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    playlist = f"{output}.txt"
+    with open(playlist, "w") as f:
+        for video in videos:
+            path = os.path.abspath(video).replace("'", "'\\''")
+            f.write(f"file '{path}'\n")
+
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0"]
+        + ["-i", playlist, "-c", "copy", output],
+        check=True,
+    )
+    os.remove(playlist)
+
+
+# Bump to invalidate every cached render, e.g. when scene_fingerprint changes.
+CACHE_FORMAT = 1
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# (tree, {name: [top-level nodes defining it]}) for a source file.
+@lru_cache(maxsize=None)
+def _parse_source(path: str):
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    definitions = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            definitions.setdefault(node.name, []).append(node)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    definitions.setdefault(target.id, []).append(node)
+    return tree, definitions
+
+
+# Files a piece of source refers to by path: string literals such as
+# "resources/paper-image-1.png", and os.path.join calls ending in literals
+# such as join(dirname(__file__), "..", "src", "coffman-graham-algorithm.py").
+# Paths are tried relative to the repository root (where scenes run) and to
+# the file's own directory.
+def _referenced_files(node, directory: str) -> set:
+    files = set()
+    for child in ast.walk(node):
+        names = []
+        if isinstance(child, ast.Constant) and isinstance(child.value, str):
+            names.append(child.value)
+        elif isinstance(child, ast.Call) and getattr(child.func, "attr", "") == "join":
+            parts = []
+            for arg in reversed(child.args):
+                if not (isinstance(arg, ast.Constant) and isinstance(arg.value, str)):
+                    break
+                parts.append(arg.value)
+            if parts:
+                names.append(os.path.join(*reversed(parts)))
+
+        for name in names:
+            if not name or len(name) > 255 or "\n" in name:
+                continue
+            for base in (ROOT, directory):
+                path = os.path.normpath(os.path.join(base, name))
+                if os.path.isfile(path):
+                    files.add(path)
+    return files
+
+
+# Modules next to `path` that it imports (e.g. scenes/layout.py), and
+# everything those import or refer to by path in turn, as a set of files.
+def _local_dependencies(path: str, found=None) -> set:
+    found = set() if found is None else found
+    directory = os.path.dirname(path)
+    tree, _ = _parse_source(path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules = [node.module]
+        else:
+            continue
+        for module in modules:
+            local = os.path.join(directory, *module.split(".")) + ".py"
+            if os.path.isfile(local) and local not in found:
+                found.add(local)
+                found |= _referenced_files(_parse_source(local)[0], directory)
+                _local_dependencies(local, found)
+    return found
+
+
+# Hash of everything that decides how `job` renders: the scene class, every
+# top-level function, class or constant of its file that it uses (directly
+# or through other helpers), the file's imports, local modules it imports,
+# files it refers to by path (resources/*.png), the quality flag and the
+# manim version. Source is hashed as its AST, so comments and moving code
+# around the file do not invalidate the cache.
+def scene_fingerprint(job: SceneJob, quality: str, manim_version: str) -> str:
+    path = os.path.join(ROOT, job.path)
+    tree, definitions = _parse_source(path)
+    directory = os.path.dirname(path)
+
+    h = hashlib.sha256()
+    h.update(json.dumps([CACHE_FORMAT, job.name, quality, manim_version]).encode())
+
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            h.update(ast.dump(node).encode())
+
+    files = _local_dependencies(path)
+    pending, seen = [job.name], set()
+    while pending:
+        name = pending.pop()
+        if name in seen or name not in definitions:
+            continue
+        seen.add(name)
+        for node in definitions[name]:
+            h.update(ast.dump(node).encode())
+            files |= _referenced_files(node, directory)
+            pending.extend(
+                child.id for child in ast.walk(node) if isinstance(child, ast.Name)
+            )
+
+    for file in sorted(files):
+        h.update(os.path.relpath(file, ROOT).encode())
+        h.update(_file_digest(file).encode())
+    return h.hexdigest()
+
+
+def manim_version(manim: str = "manim") -> str:
+    result = subprocess.run(
+        [*manim.split(), "--version"], capture_output=True, text=True
+    )
+    return result.stdout.strip()
+
+
+# "500M", "20G" -> bytes.
+def parse_size(size: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    size = size.strip().upper().removesuffix("B")
+    if size and size[-1] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+# Content-addressed store of rendered videos:
+#
+#   objects/ab/abcdef....mp4   videos, named by the hash of their bytes
+#   keys/12/123456....json     scene fingerprint -> object, render time
+#
+# Identical videos are stored once. Using an object bumps its mtime, and
+# evict() deletes the least recently used objects until the store fits in
+# max_bytes; keys left pointing at a deleted object are misses. Writes go
+# through a temporary file and os.replace, so an interrupted run never
+# leaves a partial video behind.
+class RenderCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0.0
+
+    def _key_path(self, key: str) -> str:
+        return os.path.join(self.directory, "keys", key[:2], f"{key}.json")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.mp4")
+
+    def _write(self, path: str, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    # The cached video for `key`, or None on a miss.
+    def get(self, key: str):
+        try:
+            with open(self._key_path(key)) as f:
+                entry = json.load(f)
+            video = self._object_path(entry["object"])
+            os.utime(video)
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.saved += entry["seconds"]
+        return video
+
+    # Stores `video`, which took `seconds` to render, under `key` and returns
+    # its path in the store.
+    def put(self, key: str, video: str, seconds: float) -> str:
+        digest = _file_digest(video)
+        stored = self._object_path(digest)
+        if os.path.exists(stored):
+            os.utime(stored)
+        else:
+            with open(video, "rb") as source:
+                self._write(stored, lambda f: shutil.copyfileobj(source, f))
+
+        entry = {"object": digest, "seconds": seconds, "created": time.time()}
+        self._write(self._key_path(key), lambda f: f.write(json.dumps(entry).encode()))
+        return stored
+
+    def evict(self):
+        objects = []
+        for parent, _, names in os.walk(os.path.join(self.directory, "objects")):
+            for name in names:
+                path = os.path.join(parent, name)
+                stat = os.stat(path)
+                objects.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in objects)
+        for _, size, path in sorted(objects):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def report(self) -> str:
+        return (
+            f"cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.saved:.1f}s of rendering saved"
+        )
+
+
+# TeX pre-pass. Every distinct TeX document costs a LaTeX and dvisvgm run,
+# which manim caches in its tex_dir as <hash of the document>.svg. Before the
+# renders start, the documents they are going to need are compiled in
+# parallel, each by exactly one process, into one shared tex_dir that every
+# render is seeded from (see render_scene), so the renders only read finished
+# SVGs.
+
+TEX_CLASSES = {"MathTex", "Tex", "SingleStringMathTex"}
+
+# Keyword arguments that change which documents get compiled. font_size,
+# color, ... only style the resulting SVG.
+TEX_KEYWORDS = {
+    "arg_separator",
+    "tex_environment",
+    "substrings_to_isolate",
+    "tex_to_color_map",
+}
+
+# Cap on iterations followed per loop, and on calls recorded per scene.
+TEX_LOOP_LIMIT = 1000
+TEX_CALL_LIMIT = 10000
+
+
+class _Unknown(Exception):
+    pass
+
+
+# The value of a constant expression (strings, f-strings, arithmetic, lists)
+# under `env`, or _Unknown.
+def _evaluate(node, env: dict):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id not in env:
+            raise _Unknown
+        return env[node.id]
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for part in node.values:
+            if isinstance(part, ast.Constant):
+                parts.append(part.value)
+                continue
+            value = _evaluate(part.value, env)
+            if part.conversion == ord("r"):
+                value = repr(value)
+            elif part.conversion == ord("a"):
+                value = ascii(value)
+            spec = _evaluate(part.format_spec, env) if part.format_spec else ""
+            parts.append(format(value, spec))
+        return "".join(parts)
+    if isinstance(node, ast.BinOp):
+        left, right = _evaluate(node.left, env), _evaluate(node.right, env)
+        operators = {
+            ast.Add: lambda a, b: a + b,
+            ast.Sub: lambda a, b: a - b,
+            ast.Mult: lambda a, b: a * b,
+            ast.FloorDiv: lambda a, b: a // b,
+            ast.Mod: lambda a, b: a % b,
+        }
+        if type(node.op) not in operators:
+            raise _Unknown
+        try:
+            return operators[type(node.op)](left, right)
+        except Exception:
+            raise _Unknown
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_evaluate(node.operand, env)
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_evaluate(element, env) for element in node.elts]
+    raise _Unknown
+
+
+def _assigned_names(statements) -> set:
+    return {
+        node.id
+        for statement in statements
+        for node in ast.walk(statement)
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)
+    }
+
+
+# Walks a scene's methods as straight-line code, tracking the variables
+# whose values are known (literals, `s += r", T_2"`, loop variables of
+# range() loops, arguments of calls to nested helpers and methods), and
+# records every MathTex/Tex call whose strings are all known as
+# (class, args, kwargs). Anything it cannot follow is left for the render to
+# compile as usual.
+class _TexCollector:
+    def __init__(self, functions: dict):
+        self.functions = functions
+        self.calls = {}
+        self.followed = set()
+
+    def block(self, statements, env: dict):
+        for statement in statements:
+            self.statement(statement, env)
+
+    def statement(self, node, env: dict):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            # followed where it is called, with its arguments
+            self.functions.setdefault(node.name, []).append(node)
+            return
+
+        if isinstance(node, ast.Assign):
+            self.expression(node.value, env)
+            try:
+                value = _evaluate(node.value, env)
+            except _Unknown:
+                value = _Unknown
+            for target in node.targets:
+                for name in _assigned_names([target]):
+                    env.pop(name, None)
+                if isinstance(target, ast.Name) and value is not _Unknown:
+                    env[target.id] = value
+            return
+
+        if isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+            self.expression(node.value, env)
+            name = node.target.id
+            try:
+                load = ast.Name(id=name, ctx=ast.Load())
+                env[name] = _evaluate(ast.BinOp(load, node.op, node.value), env)
+            except _Unknown:
+                env.pop(name, None)
+            return
+
+        if isinstance(node, ast.For):
+            self.expression(node.iter, env)
+            assigned = _assigned_names([node.target, *node.body, *node.orelse])
+            values = None
+            iterator = node.iter
+            if (
+                isinstance(node.target, ast.Name)
+                and isinstance(iterator, ast.Call)
+                and getattr(iterator.func, "id", "") == "range"
+            ):
+                try:
+                    values = range(*[_evaluate(arg, env) for arg in iterator.args])
+                except (_Unknown, TypeError, ValueError):
+                    values = None
+
+            if values is None:
+                inner = {k: v for k, v in env.items() if k not in assigned}
+                self.block(node.body, inner)
+            else:
+                for value in values[:TEX_LOOP_LIMIT]:
+                    inner = {k: v for k, v in env.items() if k not in assigned}
+                    inner[node.target.id] = value
+                    self.block(node.body, inner)
+            for name in assigned:
+                env.pop(name, None)
+            return
+
+        if isinstance(node, (ast.While, ast.If, ast.With, ast.Try)):
+            for field, value in ast.iter_fields(node):
+                if isinstance(value, ast.AST):
+                    self.expression(value, env)
+            for field in ("body", "orelse", "finalbody"):
+                self.block(getattr(node, field, []), env)
+            for handler in getattr(node, "handlers", []):
+                self.block(handler.body, env)
+            return
+
+        self.expression(node, env)
+
+    def expression(self, node, env: dict):
+        for child in ast.walk(node):
+            if isinstance(child, ast.Call):
+                self.call(child, env)
+
+    def call(self, node, env: dict):
+        if len(self.calls) >= TEX_CALL_LIMIT:
+            return
+        function = node.func
+        if isinstance(function, ast.Name):
+            name, method = function.id, False
+        elif (
+            isinstance(function, ast.Attribute)
+            and getattr(function.value, "id", "") == "self"
+        ):
+            name, method = function.attr, True
+        else:
+            return
+
+        if name in TEX_CLASSES:
+            self.tex(name, node, env)
+            return
+
+        for definition in self.functions.get(name, []):
+            self.follow(definition, node, env, method)
+
+    def tex(self, name: str, node, env: dict):
+        try:
+            args = [_evaluate(arg, env) for arg in node.args]
+            kwargs = {}
+            for keyword in node.keywords:
+                if keyword.arg == "tex_to_color_map":
+                    # the colors do not matter, only what gets isolated
+                    if not isinstance(keyword.value, ast.Dict):
+                        raise _Unknown
+                    keys = [_evaluate(key, env) for key in keyword.value.keys]
+                    kwargs[keyword.arg] = {key: "#FFFFFF" for key in keys}
+                elif keyword.arg in TEX_KEYWORDS:
+                    kwargs[keyword.arg] = _evaluate(keyword.value, env)
+                elif keyword.arg is None or keyword.arg == "tex_template":
+                    raise _Unknown
+        except _Unknown:
+            return
+        if not all(isinstance(arg, str) for arg in args):
+            return
+        self.calls.setdefault(repr((name, args, kwargs)), (name, args, kwargs))
+
+    def follow(self, definition, node, env: dict, method: bool):
+        parameters = [a.arg for a in definition.args.posonlyargs + definition.args.args]
+        if method:
+            parameters = parameters[1:]
+
+        binding = {}
+        defaults = definition.args.defaults
+        defaulted = parameters[len(parameters) - len(defaults) :]
+        for parameter, default in zip(defaulted, defaults):
+            try:
+                binding[parameter] = _evaluate(default, {})
+            except _Unknown:
+                pass
+
+        arguments = list(zip(parameters, node.args))
+        arguments += [(k.arg, k.value) for k in node.keywords if k.arg in parameters]
+        for parameter, arg in arguments:
+            try:
+                binding[parameter] = _evaluate(arg, env)
+            except _Unknown:
+                binding.pop(parameter, None)
+
+        key = (id(definition), repr(sorted(binding.items())))
+        if key in self.followed:
+            return
+        self.followed.add(key)
+
+        inner = {k: v for k, v in env.items() if k not in parameters}
+        inner.update(binding)
+        self.block(definition.body, inner)
+
+
+# Every MathTex/Tex call of the scene `job` whose strings can be worked out
+# from the source, as [(class name, args, kwargs)].
+def collect_tex(job: SceneJob) -> list:
+    tree, definitions = _parse_source(os.path.join(ROOT, job.path))
+    scene = next(
+        node
+        for node in definitions[job.name]
+        if isinstance(node, ast.ClassDef)
+    )
+
+    functions = {
+        name: [
+            n for n in nodes if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        for name, nodes in definitions.items()
+    }
+    for node in scene.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.setdefault(node.name, []).append(node)
+
+    collector = _TexCollector(functions)
+    construct = [n for n in scene.body if getattr(n, "name", "") == "construct"]
+    for method in construct or functions.get(job.name, []):
+        collector.block(method.body, {})
+    return list(collector.calls.values())
+
+
+# A one-path SVG that stands in for every document during the dry run.
+_PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1 1">'
+    '<path d="M0 0H1V1Z"/></svg>'
+)
+
+
+# Runs in a pre-pass process: builds each MathTex/Tex with manim itself, but
+# with tex_to_svg_file swapped for a recorder, so nothing is compiled and the
+# result is exactly the set of (expression, environment) documents the render
+# compiles. A MathTex compiles its joined string and then each of its pieces
+# again as a SingleStringMathTex, so calls often share documents.
+def _tex_documents(calls: list) -> set:
+    from pathlib import Path
+
+    import manim
+    from manim.mobject.text import tex_mobject
+
+    documents = set()
+    with tempfile.TemporaryDirectory() as directory:
+        placeholder = Path(directory, "placeholder.svg")
+        placeholder.write_text(_PLACEHOLDER_SVG)
+
+        def record(expression, environment=None, tex_template=None):
+            documents.add((expression, environment))
+            return placeholder
+
+        compile_svg = tex_mobject.tex_to_svg_file
+        tex_mobject.tex_to_svg_file = record
+        try:
+            for name, args, kwargs in calls:
+                try:
+                    getattr(manim, name)(*args, **kwargs)
+                except Exception:
+                    pass  # the render reports it
+        finally:
+            tex_mobject.tex_to_svg_file = compile_svg
+    return documents
+
+
+# Puts `svg` into `directory` under the same name, as a hard link (or a copy
+# across file systems) renamed into place, so readers of `directory` see no
+# file or the finished one, never a partial SVG.
+def _publish_svg(svg: str, directory: str):
+    target = os.path.join(directory, os.path.basename(svg))
+    temporary = f"{target}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        os.link(svg, temporary)
+    except OSError:
+        shutil.copyfile(svg, temporary)
+    os.replace(temporary, target)
+
+
+# Compiled documents in `directory`. <hash>_.svg is manim's scratch copy of an
+# SVG being parsed.
+def _tex_svgs(directory: str) -> set:
+    return {
+        name
+        for name in os.listdir(directory)
+        if name.endswith(".svg") and not name.endswith("_.svg")
+    }
+
+
+# Runs in a pre-pass process: compiles `documents` with manim's own
+# tex_to_svg_file, so the file names are the hashes the render looks up. The
+# compile happens in a private directory (manim deletes every .dvi and .log
+# in its tex_dir after each compile) and each SVG is then published into
+# tex_dir. Returns how many failed; real LaTeX errors surface in the render.
+def _compile_tex(documents: list, tex_dir: str) -> int:
+    import manim
+    from manim.utils.tex_file_writing import generate_tex_file, tex_to_svg_file
+
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix=".prewarm-", dir=tex_dir) as private:
+        manim.config.tex_dir = private
+        for expression, environment in documents:
+            tex_file = generate_tex_file(expression, environment)
+            if os.path.exists(os.path.join(tex_dir, f"{tex_file.stem}.svg")):
+                continue
+            try:
+                svg = tex_to_svg_file(expression, environment)
+            except Exception:
+                failed += 1
+                continue
+            _publish_svg(str(svg), tex_dir)
+    return failed
+
+
+# Compiles the TeX of `jobs` into `tex_dir` on `workers` processes: a dry run
+# turns the calls into the documents they compile, and each distinct document
+# is compiled by exactly one process. Returns (documents compiled or already
+# in tex_dir, seconds), or None when manim cannot be imported here, in which
+# case the renders compile their TeX themselves.
+def prewarm_tex(jobs, tex_dir: str, workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+    from importlib.util import find_spec
+
+    if find_spec("manim") is None:
+        return None
+
+    calls = {}
+    for job in jobs:
+        for call in collect_tex(job):
+            calls.setdefault(repr(call), call)
+    calls = list(calls.values())
+    if not calls:
+        return 0, 0.0
+
+    start = time.perf_counter()
+    os.makedirs(tex_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(calls))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = [calls[i::workers] for i in range(workers)]
+        documents = set().union(*pool.map(_tex_documents, chunks))
+        documents = sorted(documents, key=repr)
+        chunks = [documents[i::workers] for i in range(workers)]
+        failed = sum(pool.map(_compile_tex, chunks, [tex_dir] * workers))
+    return len(documents) - failed, time.perf_counter() - start
+
+
+# manim config pointing a render at `tex_dir`.
+def write_tex_config(media_dir: str, tex_dir: str) -> str:
+    os.makedirs(media_dir, exist_ok=True)
+    config_file = os.path.join(media_dir, "render.cfg")
+    with open(config_file, "w") as f:
+        f.write("[CLI]\n")
+        f.write(f"tex_dir = {os.path.abspath(tex_dir).replace('%', '%%')}\n")
+    return config_file
+
+
+# Renders `jobs` on `workers` threads, each driving one manim process, and
+# reports each scene as it finishes. Scenes found in `cache` are not
+# rendered; the others are added to it. With a `tex_dir`, the renders share
+# their compiled TeX through it and, if `prewarm`, it is compiled into it up
+# front. Returns {job: video or None}.
+def render_all(
+    jobs,
+    quality="k",
+    workers=None,
+    media_dir="media",
+    manim="manim",
+    cache=None,
+    tex_dir=None,
+    prewarm=True,
+):
+    workers = workers or os.cpu_count() or 1
+    videos, keys = {}, {}
+    if cache is not None:
+        version = manim_version(manim)
+        for job in jobs:
+            keys[job] = scene_fingerprint(job, quality, version)
+            videos[job] = cache.get(keys[job])
+            if videos[job] is not None:
+                print(f"{job!r}: cached", file=sys.stderr)
+    pending = [job for job in jobs if videos.get(job) is None]
+
+    if tex_dir is not None and pending:
+        os.makedirs(tex_dir, exist_ok=True)
+        if prewarm:
+            warmed = prewarm_tex(pending, tex_dir, workers)
+            if warmed is None:
+                print("tex: manim not importable, skipping pre-pass", file=sys.stderr)
+            else:
+                print(
+                    f"tex: {warmed[0]} documents in {warmed[1]:.1f}s", file=sys.stderr
+                )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(render_scene, job, quality, media_dir, manim, tex_dir)
+            for job in pending
+        ]
+        try:
+            for future in futures:
+                job, seconds, video = future.result()
+                status = "ok" if video else "FAILED"
+                print(f"{job!r}: {status} in {seconds:.1f}s", file=sys.stderr)
+                if video is not None and cache is not None:
+                    video = cache.put(keys[job], video, seconds)
+                videos[job] = video
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    return videos
+
+
+def render_main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="render.py",
+        description="Render the scenes in parallel and stitch them in script order.",
+    )
+    parser.add_argument(
+        "scenes",
+        nargs="*",
+        help="scene class names to render (default: all, stitched)",
+    )
+    parser.add_argument(
+        "-q",
+        "--quality",
+        choices=sorted(QUALITIES),
+        default="k",
+        help="manim quality flag (default: k, 4K)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="scenes rendered at once (default: CPU count)",
+    )
+    parser.add_argument(
+        "--files",
+        nargs="+",
+        default=SCENE_FILES,
+        help="scene files, in script order",
+    )
+    parser.add_argument("--media-dir", default="media")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="stitched video (default: <media-dir>/coffman-graham-<quality>.mp4)",
+    )
+    parser.add_argument(
+        "--no-stitch", action="store_true", help="render only, do not stitch"
+    )
+    parser.add_argument("--list", action="store_true", help="list scenes and exit")
+    parser.add_argument(
+        "--cache-dir",
+        default=".render-cache",
+        help="rendered video cache (default: .render-cache)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=parse_size,
+        default="20G",
+        help="evict least recently used videos beyond this size (default: 20G)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="render every scene, ignore the cache"
+    )
+    parser.add_argument(
+        "--tex-dir",
+        default=None,
+        help="compiled TeX shared by all renders (default: <media-dir>/Tex)",
+    )
+    parser.add_argument(
+        "--no-tex-prewarm",
+        action="store_true",
+        help="do not compile the scenes' TeX before rendering",
+    )
+    parser.add_argument("--manim", default="manim", help="manim command")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg command")
+    args = parser.parse_args(argv)
+
+    jobs = discover_scenes(args.files)
+    if args.list:
+        for job in jobs:
+            print(f"{job.path} {job.name}")
+        return 0
+
+    if args.scenes:
+        unknown = set(args.scenes) - {job.name for job in jobs}
+        if unknown:
+            parser.error(f"unknown scenes: {', '.join(sorted(unknown))}")
+        jobs = [job for job in jobs if job.name in args.scenes]
+
+    if shutil.which(args.manim.split()[0]) is None:
+        parser.error(f"{args.manim!r} not found")
+
+    media_dir = os.path.join(ROOT, args.media_dir)
+    start = time.perf_counter()
+    cache = None
+    if not args.no_cache:
+        cache = RenderCache(os.path.join(ROOT, args.cache_dir), args.cache_size)
+    tex_dir = os.path.join(ROOT, args.tex_dir or os.path.join(args.media_dir, "Tex"))
+    videos = render_all(
+        jobs,
+        args.quality,
+        args.workers,
+        media_dir,
+        args.manim,
+        cache,
+        tex_dir,
+        not args.no_tex_prewarm,
+    )
+
+    failed = [job for job in jobs if videos.get(job) is None]
+    for job in failed:
+        log = os.path.join(scene_media_dir(media_dir, job), "render.log")
+        print(f"{job!r} failed, see {log}", file=sys.stderr)
+
+    if not failed and not args.no_stitch and not args.scenes:
+        output = args.output or os.path.join(
+            media_dir, f"coffman-graham-{QUALITIES[args.quality]}.mp4"
+        )
+        stitch([videos[job] for job in jobs], output, args.ffmpeg)
+        print(output)
+
+    print(
+        f"{len(jobs) - len(failed)}/{len(jobs)} scenes in "
+        f"{time.perf_counter() - start:.1f}s",
+        file=sys.stderr,
+    )
+    if cache is not None:
+        cache.evict()
+        print(cache.report(), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(render_main())
@@ -1,18 +0,0 @@
-# -ql renders in low quality
-
-# in shotcut
-#manim -qk scenes/introduction.py Title
-#manim -qk scenes/introduction.py TaskIntroduction
-#manim -qk scenes/introduction.py TimeComplexityExplanation
-#manim -qk scenes/introduction.py DAGScene
-#manim -qk scenes/algorithm-a.py PaperDisplay 
-#manim -qk scenes/algorithm-a.py AlgorithmA
-#manim -qk scenes/algorithm-a.py OptimalScheduleForIntroDAG
-#manim -qk scenes/algorithm-a.py CoffmanGrahamAlgorithmExplainerPart1
-#manim -qk scenes/algorithm-a.py CoffmanGrahamAlgorithmRecap
-#manim -qk scenes/algorithm-a.py CoffmanGrahamAlgorithmCodeAndAnalysisSetup
-#manim -qk scenes/algorithm-a.py CoffmanGrahamAlgorithmCodeAndAnalysis
-
-# done, pending render
-
-# in progress
@@ -0,0 +1,126 @@
+import importlib.util
+import os
+import sys
+from math import ceil, sqrt
+
+
+# The labeling lives in src/coffman-graham-algorithm.py, whose name has
+# hyphens, so it is loaded by path (once per process).
+def _load_coffman_graham():
+    name = "coffman_graham_algorithm"
+    if name not in sys.modules:
+        path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "..",
+            "src",
+            "coffman-graham-algorithm.py",
+        )
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+cg = _load_coffman_graham()
+
+
+# Coffman-Graham layering: the Coffman-Graham schedule of G on `width`
+# processors, read as layers. Every layer holds at most `width` tasks, every
+# edge points to a later layer, and the number of layers is at most
+# (2 - 2 / width) times the fewest possible for that width. Sources end up at
+# the top, sinks at the bottom.
+def coffman_graham_layers(G, width=None) -> list:
+    if width is None:
+        width = max(1, ceil(sqrt(G.number_of_tasks())))
+    schedule = cg.list_schedule(G, cg.coffman_graham(G), width)
+    return [schedule.at(mu) for mu in range(schedule.makespan)]
+
+
+# Crossings between edges joining consecutive layers, by counting inversions
+# with a Fenwick tree, O(e log n). Edges that skip layers are not counted.
+def count_crossings(G, layers) -> int:
+    crossings = 0
+    for upper, lower in zip(layers, layers[1:]):
+        below = {T: i for i, T in enumerate(lower)}
+        ends = sorted(
+            (i, below[t]) for i, T in enumerate(upper) for t in G.S(T) if t in below
+        )
+        tree = [0] * (len(lower) + 1)
+        for seen, (_, j) in enumerate(ends):
+            # edges already seen whose lower end is right of j cross this one
+            k, at_most = j + 1, 0
+            while k > 0:
+                at_most += tree[k]
+                k -= k & -k
+            crossings += seen - at_most
+            k = j + 1
+            while k <= len(lower):
+                tree[k] += 1
+                k += k & -k
+    return crossings
+
+
+# Barycenter heuristic: alternately sweeps down (ordering each layer by the
+# mean position of its predecessors) and up (of its successors), and keeps
+# the best ordering seen. Positions are centered on each layer, so layers of
+# different widths line up. O(sweeps * (n log n + e)).
+def reduce_crossings(G, layers, sweeps=8) -> list:
+    layers = [list(layer) for layer in layers]
+    position = {}
+
+    def place(layer):
+        middle = (len(layer) - 1) / 2
+        for i, T in enumerate(layer):
+            position[T] = i - middle
+
+    for layer in layers:
+        place(layer)
+
+    best = [list(layer) for layer in layers]
+    fewest = count_crossings(G, layers)
+
+    for sweep in range(sweeps):
+        if fewest == 0:
+            break
+        down = sweep % 2 == 0
+        neighbours = G.P if down else G.S
+        for layer in layers[1:] if down else layers[-2::-1]:
+            key = {}
+            for T in layer:
+                adjacent = neighbours(T)
+                if adjacent:
+                    key[T] = sum(position[t] for t in adjacent) / len(adjacent)
+                else:
+                    key[T] = position[T]
+            layer.sort(key=lambda T: (key[T], position[T]))
+            place(layer)
+
+        crossings = count_crossings(G, layers)
+        if crossings < fewest:
+            best = [list(layer) for layer in layers]
+            fewest = crossings
+
+    return best
+
+
+# Scene coordinates for every task of G: layered with coffman_graham_layers,
+# ordered with reduce_crossings, x_gap apart within a layer and y_gap apart
+# between layers, centered on `center`. Returns {T: (x, y, 0.0)}, which
+# Mobject.move_to accepts directly.
+def layout_task_graph(
+    G, width=None, x_gap=2.0, y_gap=1.5, center=(0.0, 0.0), sweeps=8
+) -> dict:
+    layers = reduce_crossings(G, coffman_graham_layers(G, width), sweeps)
+
+    top = (len(layers) - 1) / 2 * y_gap
+    positions = {}
+    for depth, layer in enumerate(layers):
+        middle = (len(layer) - 1) / 2
+        for i, T in enumerate(layer):
+            positions[T] = (
+                center[0] + (i - middle) * x_gap,
+                center[1] + top - depth * y_gap,
+                0.0,
+            )
+    return positions
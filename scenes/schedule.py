@@ -0,0 +1,198 @@
+from manim import *
+
+from layout import cg, layout_task_graph
+
+PROCESSOR_COLORS = [BLUE, RED, GREEN, YELLOW, PURPLE, ORANGE, TEAL, PINK]
+
+
+# Animates the Coffman-Graham algorithm on any task graph: lays G out with
+# layout_task_graph, labels it step by step with coffman_graham_steps, showing
+# each step's candidates and their N(T), and list schedules the result on
+# `processors` processors. Subclasses only set G:
+#
+#   class MySchedule(CoffmanGrahamScheduleScene):
+#       G = cg.TaskGraph(tasks=[1, 2, 3], successors={1: [2, 3]})
+#       processors = 2
+#
+# Every step's transforms go into a single self.play. Graphs with more steps
+# than max_plays are animated several steps per play, so a 200-task graph
+# still renders in minutes. These scenes are not part of the video, render
+# them with `./render.py --files scenes/schedule.py IntroDAGSchedule`.
+class CoffmanGrahamScheduleScene(Scene):
+    G = None
+    processors = 2
+    layout_width = None  # tasks per layer, default sqrt(n)
+    step_time = 0.6
+    max_plays = 60
+    max_candidates = 6  # listed at the top, all are circled
+
+    def task_positions(self, G):
+        positions = layout_task_graph(G, width=self.layout_width, x_gap=1, y_gap=1)
+
+        # fit the drawing above the status line
+        xs = [p[0] for p in positions.values()]
+        ys = [p[1] for p in positions.values()]
+        available_width = config.frame_width - 1.5
+        available_height = config.frame_height - 2.5
+        scale = 1.5
+        if max(xs) > min(xs):
+            scale = min(scale, available_width / (max(xs) - min(xs)))
+        if max(ys) > min(ys):
+            scale = min(scale, available_height / (max(ys) - min(ys)))
+
+        self.task_scale = scale
+        return {
+            T: np.array([x * scale, y * scale + 0.5, 0])
+            for T, (x, y, _) in positions.items()
+        }
+
+    def create_task(self, T, position):
+        size = min(1, self.task_scale)
+        circle = Circle(radius=0.3 * size, color=WHITE, stroke_width=1 + 2 * size)
+        label = Text(str(T), font_size=max(8, 24 * size))
+        return VGroup(circle, label).move_to(position)
+
+    def draw_arrow(self, parent, child):
+        return Arrow(
+            start=parent.get_center(),
+            end=child.get_center(),
+            buff=parent[0].radius,
+            color=GRAY,
+            tip_shape=StealthTip,
+            tip_length=0.15 * min(1, self.task_scale),
+            stroke_width=2,
+        )
+
+    # Plays `steps` (a list of animation lists, one per algorithm step), every
+    # step in a single self.play, grouping consecutive steps when there are
+    # more than max_plays of them. `counter` counts the steps played. With
+    # `state`, each play also cross-fades to state(i), a mobject showing the
+    # state after step i, the last step of the group. Returns the state shown.
+    def play_steps(self, steps, counter, state=None):
+        per_play = -(-len(steps) // self.max_plays)
+        shown = None
+        for i in range(0, len(steps), per_play):
+            animations = [a for step in steps[i : i + per_play] for a in step]
+            done = min(i + per_play, len(steps))
+            if state is not None:
+                new = state(done - 1)
+                if shown is not None:
+                    animations.append(FadeOut(shown))
+                animations.append(FadeIn(new))
+                shown = new
+            self.play(
+                ChangeDecimalToValue(counter, done),
+                *animations,
+                run_time=self.step_time,
+            )
+        return shown
+
+    # The candidates of one labeling step, in the order they get their labels
+    # (the task labeled in this step first): circled on the graph, and listed
+    # with their N(T) at the top.
+    def create_candidates(self, task, candidates, tasks):
+        def color(T):
+            return YELLOW if T == task else BLUE
+
+        rings = VGroup(
+            *[
+                Circle(
+                    radius=tasks[T][0].radius * 1.35, color=color(T), stroke_width=2
+                ).move_to(tasks[T])
+                for T in candidates
+            ]
+        )
+
+        listed = list(candidates.items())[: self.max_candidates]
+        row = VGroup(
+            Text("N(T):", font_size=20),
+            *[
+                Text(f"{T}: ({', '.join(map(str, N))})", font_size=20, color=color(T))
+                for T, N in listed
+            ],
+        )
+        if len(candidates) > len(listed):
+            row.add(Text(f"+{len(candidates) - len(listed)} more", font_size=20))
+        row.arrange(RIGHT, buff=0.35).to_edge(UP, buff=0.3)
+        if row.width > config.frame_width - 1:
+            row.scale_to_fit_width(config.frame_width - 1)
+        return VGroup(rings, row)
+
+    def create_counter(self, tex):
+        counter = Integer(0, font_size=32)
+        status = VGroup(MathTex(tex, font_size=32), counter)
+        status.arrange(RIGHT, buff=0.2).to_edge(DOWN, buff=0.5)
+        return status, counter
+
+    def construct(self):
+        G = self.G
+        # (task, candidates) of every step up front; candidates are ready
+        # tasks, all their successors labeled, so their N(T) are final
+        labeling = [
+            (step.task, step.candidates) for step in cg.coffman_graham_steps(G)
+        ]
+        L = [T for T, _ in reversed(labeling)]
+        schedule = cg.list_schedule(G, L, self.processors)
+        r = len(L)
+
+        positions = self.task_positions(G)
+        tasks = {T: self.create_task(T, positions[T]) for T in G.tasks()}
+        arrows = [
+            self.draw_arrow(tasks[T], tasks[t]) for T in G.tasks() for t in G.S(T)
+        ]
+
+        status, k = self.create_counter("k =")
+        self.play(
+            LaggedStart(*[Create(task) for task in tasks.values()], lag_ratio=0.5 / r),
+            *[Create(arrow) for arrow in arrows],
+            Write(status),
+        )
+        self.wait(1)
+
+        # Labeling: step k gives label k to the candidate with the smallest
+        # N(T), ties going to the smallest id
+        label_size = max(8, 20 * min(1, self.task_scale))
+        steps = []
+        for i, (T, _) in enumerate(labeling, start=1):
+            label = Integer(i, font_size=label_size, color=YELLOW)
+            label.next_to(tasks[T], UR, buff=0.02)
+            steps.append([FadeIn(label), tasks[T][0].animate.set_color(YELLOW)])
+        candidates = self.play_steps(
+            steps, k, lambda i: self.create_candidates(*labeling[i], tasks)
+        )
+        self.wait(1)
+        self.play(FadeOut(candidates))
+
+        # Scheduling: at time step mu the processors take the first ready
+        # tasks of L
+        clock, mu = self.create_counter(rf"m = {self.processors}, \quad \mu =")
+        self.play(FadeOut(status), FadeIn(clock))
+
+        steps = []
+        for step in range(schedule.makespan):
+            animations = []
+            for p, running in enumerate(schedule.processors):
+                T = running[step]
+                if T is not None:
+                    color = PROCESSOR_COLORS[p % len(PROCESSOR_COLORS)]
+                    animations.append(tasks[T][0].animate.set_fill(color, opacity=0.8))
+            steps.append(animations)
+        self.play_steps(steps, mu)
+        self.wait(1)
+
+        makespan = Text(f"makespan = {schedule.makespan}", font_size=28)
+        makespan.to_edge(DOWN, buff=0.5)
+        self.play(FadeOut(clock), FadeIn(makespan))
+        self.wait(2)
+
+
+class IntroDAGSchedule(CoffmanGrahamScheduleScene):
+    G = cg.TaskGraph(
+        tasks=range(1, 9),
+        successors={1: [2, 3], 3: [4, 7], 5: [3], 6: [7], 8: [6]},
+    )
+
+
+class LayeredDAGSchedule(CoffmanGrahamScheduleScene):
+    G = cg.benchmark_task_graph("layered", 200, seed=0)
+    processors = 3
@@ -1,5 +1,27 @@
+import hashlib
+import heapq
+import io
+import json
+import mmap
+import operator
+import os
+import pickle
 import random
+import re
+import struct
+import sys
 import time
+import tracemalloc
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain, compress, repeat
+
+try:
+    import numpy as np
+except ImportError:  # only the vectorized generators need it (manim pulls it in)
+    np = None
 
 class TaskGraph:
     def __init__(self, tasks=None, successors=None):
@@ -21,6 +43,32 @@ class TaskGraph:
                     self._successors[t] = []
             self._current_task_id = max(self._tasks) + 1 if self._tasks else 1
 
+        self._build_index()
+        self._validated = False
+
+    # Reverse adjacency and degree bookkeeping, O(n + e). After this every
+    # mutation keeps the index up to date in O(1) amortized.
+    def _build_index(self):
+        self._predecessors = {t: [] for t in self._tasks}
+        for task in self._tasks:
+            for t in self._successors[task]:
+                if t in self._predecessors:
+                    self._predecessors[t].append(task)
+                else:
+                    self._predecessors[t] = [task]
+
+        # dicts used as insertion ordered sets
+        self._sources = {t: None for t in self._tasks if not self._predecessors[t]}
+        self._sinks = {t: None for t in self._tasks if not self._successors[t]}
+
+        # per-task count of successors that have not been labeled yet, and the
+        # unlabeled tasks whose count is 0 (the ready frontier)
+        self._labeled = set()
+        self._unlabeled_successors = {
+            t: len(self._successors[t]) for t in self._tasks
+        }
+        self._ready = dict(self._sinks)
+
     def print_tasks(self):
         print(f"tasks: {self._tasks}")
 
@@ -33,30 +81,273 @@ class TaskGraph:
     def tasks(self):
         return self._tasks
 
-    def add_task(self):
-        tid = self._current_task_id
+    def add_task(self, tid=None):
+        if tid is None:
+            tid = self._current_task_id
 
         self._tasks.add(tid)
         if tid not in self._successors:
             self._successors[tid] = []
+        self._index_task(tid)
+        self._validated = False
 
-        self._current_task_id += 1
+        self._current_task_id = max(self._current_task_id, tid + 1)
         return tid
 
+    def _index_task(self, t):
+        if t in self._unlabeled_successors:
+            return
+
+        S_t = self._successors[t]
+        self._unlabeled_successors[t] = sum(1 for s in S_t if s not in self._labeled)
+        if not self._predecessors.setdefault(t, []):
+            self._sources[t] = None
+        if not S_t:
+            self._sinks[t] = None
+        if self._unlabeled_successors[t] == 0:
+            self._ready[t] = None
+
     def add_successor(self, predecessor, successor):
         if predecessor not in self._successors:
             self._successors[predecessor] = []
         if successor not in self._successors:
             self._successors[successor] = []
 
-        self._successors[predecessor].append(successor)
         self._tasks.update({predecessor, successor})
+        self._index_task(predecessor)
+        self._index_task(successor)
+
+        self._successors[predecessor].append(successor)
+        self._predecessors[successor].append(predecessor)
+        self._validated = False
+        self._sinks.pop(predecessor, None)
+        self._sources.pop(successor, None)
+        if successor not in self._labeled:
+            self._unlabeled_successors[predecessor] += 1
+            self._ready.pop(predecessor, None)
 
     def S(self, v) -> list:
         if v not in self._tasks:
             raise ValueError(f"Task {v} is not in the set of tasks")
         return self._successors[v]
 
+    def P(self, v) -> list:
+        if v not in self._tasks:
+            raise ValueError(f"Task {v} is not in the set of tasks")
+        return self._predecessors[v]
+
+    def in_degree(self, v) -> int:
+        return len(self.P(v))
+
+    def out_degree(self, v) -> int:
+        return len(self.S(v))
+
+    def sources(self):
+        return self._sources.keys()
+
+    def sinks(self):
+        return self._sinks.keys()
+
+    def unlabeled_successors(self, v) -> int:
+        if v not in self._tasks:
+            raise ValueError(f"Task {v} is not in the set of tasks")
+        return self._unlabeled_successors[v]
+
+    def ready_tasks(self):
+        """Unlabeled tasks all of whose successors are labeled."""
+        return self._ready.keys()
+
+    # O(in_degree(v)). Returns the predecessors of v that became ready.
+    def mark_labeled(self, v) -> list:
+        if v not in self._tasks:
+            raise ValueError(f"Task {v} is not in the set of tasks")
+        if v in self._labeled:
+            return []
+
+        self._labeled.add(v)
+        self._ready.pop(v, None)
+
+        newly_ready = []
+        for p in self._predecessors[v]:
+            self._unlabeled_successors[p] -= 1
+            if self._unlabeled_successors[p] == 0 and p not in self._labeled:
+                self._ready[p] = None
+                newly_ready.append(p)
+        return newly_ready
+
+    def reset_labels(self):
+        self._labeled.clear()
+        for t in self._tasks:
+            self._unlabeled_successors[t] = len(self._successors[t])
+        self._ready = dict(self._sinks)
+
+
+# Frozen CSR form of a TaskGraph. Tasks are stored by dense index 0..n-1, the
+# successors of index i are targets[offsets[i]:offsets[i + 1]], and task ids
+# are either base + i or ids[i] with ids strictly increasing, so comparing
+# indices is the same as comparing ids (the Coffman-Graham tie-break).
+# 4 bytes per edge and 4-12 bytes per task.
+class CompactTaskGraph:
+    __slots__ = ("_offsets", "_targets", "_ids", "_base", "_validated", "_reverse")
+
+    def __init__(self, offsets, targets, ids=None, base=0):
+        if not isinstance(offsets, array) or offsets.typecode != "i":
+            offsets = array("i", offsets)
+        if not isinstance(targets, array) or targets.typecode != "i":
+            targets = array("i", targets)
+        if ids is not None and (not isinstance(ids, array) or ids.typecode != "q"):
+            ids = array("q", ids)
+
+        n = len(offsets) - 1
+        if n < 0 or offsets[0] != 0 or offsets[-1] != len(targets):
+            raise ValueError("offsets must start at 0 and end at len(targets)")
+        if targets and (min(targets) < 0 or max(targets) >= n):
+            raise ValueError("targets must be task indices in [0, n)")
+        if ids is not None:
+            if len(ids) != n:
+                raise ValueError("ids must have one entry per task")
+            for i in range(1, n):
+                if ids[i - 1] >= ids[i]:
+                    raise ValueError("ids must be strictly increasing")
+
+        self._offsets = offsets
+        self._targets = targets
+        self._ids = ids
+        self._base = base
+        self._validated = False
+        self._reverse = None  # reverse_csr(offsets, targets), built on first P()
+
+    # Wraps existing buffers (arrays or memoryviews, e.g. over an mmap) without
+    # copying or checking them.
+    @classmethod
+    def _from_buffers(cls, offsets, targets, ids=None, base=0):
+        G = cls.__new__(cls)
+        G._offsets = offsets
+        G._targets = targets
+        G._ids = ids
+        G._base = base
+        G._validated = False
+        G._reverse = None
+        return G
+
+    @classmethod
+    def from_task_graph(cls, G: TaskGraph):
+        tasks = sorted(G.tasks())
+        n = len(tasks)
+
+        if n and tasks[-1] - tasks[0] == n - 1:
+            ids, base = None, tasks[0]
+            index_of = lambda t: t - base
+        else:
+            ids, base = array("q", tasks), 0
+            index = {t: i for i, t in enumerate(tasks)}
+            index_of = index.__getitem__
+
+        offsets = array("i", [0])
+        targets = array("i")
+        for T in tasks:  # O(n + e)
+            for t in G.S(T):
+                if t not in G.tasks():
+                    raise ValueError(f"Task {t} is not in the set of tasks")
+                targets.append(index_of(t))
+            offsets.append(len(targets))
+
+        return cls(offsets, targets, ids, base)
+
+    @classmethod
+    def from_edge_arrays(cls, num_tasks, sources, targets, ids=None, base=0):
+        """Builds the CSR form from parallel arrays of (source, target) indices."""
+        if len(sources) != len(targets):
+            raise ValueError("sources and targets must have the same length")
+
+        # counting sort by source, O(n + e), keeps the input order per source
+        offsets = array("i", bytes(4 * (num_tasks + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for i in range(num_tasks):
+            offsets[i + 1] += offsets[i]
+
+        position = array("i", offsets)
+        csr_targets = array("i", bytes(4 * len(targets)))
+        for u, v in zip(sources, targets):
+            csr_targets[position[u]] = v
+            position[u] += 1
+
+        return cls(offsets, csr_targets, ids, base)
+
+    def to_task_graph(self) -> TaskGraph:
+        task_id = self.task_id
+        return TaskGraph(
+            tasks=self.tasks(),
+            successors={task_id(i): self.S(task_id(i)) for i in range(len(self))},
+        )
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def number_of_tasks(self):
+        return len(self._offsets) - 1
+
+    def number_of_edges(self):
+        return len(self._targets)
+
+    def nbytes(self):
+        total = self._offsets.itemsize * len(self._offsets)
+        total += self._targets.itemsize * len(self._targets)
+        if self._ids is not None:
+            total += self._ids.itemsize * len(self._ids)
+        return total
+
+    @property
+    def offsets(self):
+        return self._offsets
+
+    @property
+    def targets(self):
+        return self._targets
+
+    def tasks(self):
+        if self._ids is not None:
+            return self._ids
+        return range(self._base, self._base + len(self))
+
+    def task_id(self, i):
+        if self._ids is not None:
+            return self._ids[i]
+        return self._base + i
+
+    def index_of(self, v):
+        if self._ids is not None:
+            i = bisect_left(self._ids, v)
+            if i < len(self._ids) and self._ids[i] == v:
+                return i
+        else:
+            i = v - self._base
+            if 0 <= i < len(self):
+                return i
+        raise ValueError(f"Task {v} is not in the set of tasks")
+
+    def successor_indices(self, i):
+        return self._targets[self._offsets[i] : self._offsets[i + 1]]
+
+    def S(self, v) -> list:
+        i = self.index_of(v)
+        return [self.task_id(j) for j in self.successor_indices(i)]
+
+    def P(self, v) -> list:
+        i = self.index_of(v)
+        if self._reverse is None:
+            self._reverse = reverse_csr(self._offsets, self._targets)
+        pred_offsets, preds = self._reverse
+        return [self.task_id(j) for j in preds[pred_offsets[i] : pred_offsets[i + 1]]]
+
+    def in_degree(self, v) -> int:
+        return len(self.P(v))
+
+    def out_degree(self, v) -> int:
+        i = self.index_of(v)
+        return self._offsets[i + 1] - self._offsets[i]
+
 
 # helper function for coffman_graham_algorithm, O(n) where n = max(len(a),len(b))
 def less_than_lexicographically(a: list, b: list) -> bool:
@@ -76,13 +367,67 @@ def less_than_lexicographically(a: list, b: list) -> bool:
     return len(a) < len(b)
 
 
-def coffman_graham_algorithm(G: TaskGraph):
+# Opt-in counters and phase timers for the labeling engines. Pass one as
+# `instrument=` to coffman_graham (or an engine); with the default None the
+# engines never touch it. Each run ends with one record
+#   {"engine": ..., "tasks": n, "counters": {...}, "timers": {...}}
+# handed to the sink: a callable gets the record, a dict accumulates the
+# counters and timers (summed over runs), anything with write() gets the
+# record as a JSON line. Counters and timers are reset after every record.
+class Instrumentation:
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    # less_than_lexicographically, counting the comparison and the list
+    # elements it looked at
+    def less_than(self, a: list, b: list) -> bool:
+        n = min(len(a), len(b))
+        i = 0
+        while i < n and a[i] == b[i]:
+            i += 1
+        self.count("comparisons")
+        self.count("elements_compared", min(i + 1, n))
+        return less_than_lexicographically(a, b)
+
+    def flush(self, **fields) -> dict:
+        record = dict(fields, counters=self.counters, timers=self.timers)
+        self.counters = {}
+        self.timers = {}
+
+        sink = self.sink
+        if sink is None:
+            pass
+        elif isinstance(sink, dict):
+            for group in ("counters", "timers"):
+                total = sink.setdefault(group, {})
+                for name, value in record[group].items():
+                    total[name] = total.get(name, 0) + value
+        elif callable(sink):
+            sink(record)
+        else:
+            sink.write(json.dumps(record) + "\n")
+        return record
+
+
+def coffman_graham_algorithm(G: TaskGraph, instrument=None):
     r = G.number_of_tasks()
     k = 1
     alpha = {}
+    less_than = (
+        less_than_lexicographically if instrument is None else instrument.less_than
+    )
 
-    # (a) choose first task with S(T) = {}
-    for T in G.tasks():  # O(n)
+    # (a) choose first task with S(T) = {}; they all have N(T) = (), so the
+    # smallest id goes first
+    for T in sorted(G.tasks()):  # O(n log n)
         if not G.S(T):
             alpha[T] = k
             k += 1
@@ -92,7 +437,10 @@ def coffman_graham_algorithm(G: TaskGraph):
 
     # (b)
     while k <= r:  # In worst case, O(n). Overall O(n^3).
-        N = {}
+        if instrument is not None:
+            t0 = time.perf_counter()
+
+        ready = []
         for T in G.tasks():  # O(n)
             if T in alpha:
                 continue
@@ -106,12 +454,18 @@ def coffman_graham_algorithm(G: TaskGraph):
                     break
 
             if all_successors_defined:
-                N[T] = sorted([alpha[t] for t in S_T], reverse=True)
+                ready.append((T, S_T))
+
+        if instrument is not None:
+            t1 = time.perf_counter()
+
+        N = {T: sorted([alpha[t] for t in S_T], reverse=True) for T, S_T in ready}
 
         if not N:
             raise ValueError("G is not a valid task graph")
 
-        # print(f"\tN: {N}")
+        if instrument is not None:
+            t2 = time.perf_counter()
 
         current_min_n = None
         for n in N:
@@ -119,32 +473,1964 @@ def coffman_graham_algorithm(G: TaskGraph):
                 current_min_n = n
                 continue
 
-            lt_eq_lex = less_than_lexicographically(N[n], N[current_min_n])
-            # print(
-            #     f"\t N[{n}] < N[{current_min_n}] = {lt_eq_lex} -> {N[n]} < {N[current_min_n]} = {lt_eq_lex}"
-            # )
-            if lt_eq_lex:
+            if less_than(N[n], N[current_min_n]):
                 current_min_n = n
             elif N[n] == N[current_min_n]:
                 if n < current_min_n:
                     current_min_n = n
 
-            # print(f"n: {n}")
-
         alpha[current_min_n] = k
         k += 1
 
-        # print("--------")
-        # print(f"k: {k}")
-        # print(f"\tcurrent_min_n: {current_min_n}")
-        # print(f"\tN: {N}")
-        # print(f"\tcurrent alpha: {alpha}")
-        # print("--------\n")
+        if instrument is not None:
+            t3 = time.perf_counter()
+            instrument.add_time("discover", t1 - t0)
+            instrument.add_time("sort", t2 - t1)
+            instrument.add_time("select", t3 - t2)
+            instrument.count("rounds")
+            instrument.count("tasks_scanned", r)
+            instrument.count("candidates", len(N))
+            instrument.count("labels_sorted", sum(map(len, N.values())))
+
+    if instrument is not None:
+        instrument.flush(engine="reference", tasks=r)
 
     schedule = sorted(alpha.keys(), key=lambda task: alpha[task])
     return schedule[::-1]
 
 
+# Sethi-style labeling, O(n + e) plus the sort of each ready bucket.
+#
+# N(T) is the decreasing list of successor labels, so its first element is the
+# label whose assignment made T ready. Every task that becomes ready later has
+# a larger first element and therefore a larger N(T), so the ready set is a
+# FIFO of buckets, one per label k, and only the front bucket is ever looked
+# at. Labels are handed out in increasing order, so appending k to each
+# predecessor's list builds N(T) (reversed) without any sorting.
+def coffman_graham_alpha_sethi(G: TaskGraph, instrument=None) -> dict:
+    order = _sethi_order(G, G.tasks(), instrument=instrument)
+    if instrument is not None:
+        instrument.flush(engine="sethi", tasks=len(order))
+    return {T: k for k, T in enumerate(order, 1)}
+
+
+# Labels `tasks` (all of G, or a union of components of G) and returns them in
+# label order. When given, trigger[T] is set to the task whose labeling made T
+# ready.
+def _sethi_order(G: TaskGraph, tasks, trigger=None, instrument=None) -> list:
+    r = len(tasks)
+    if instrument is not None:
+        t0 = time.perf_counter()
+
+    remaining = {T: G.out_degree(T) for T in tasks}  # unlabeled successors
+
+    # (a) every task with S(T) = {} is labeled first, smallest id first
+    sinks = sorted(T for T in tasks if remaining[T] == 0)
+    if not sinks:
+        raise ValueError("G is not a valid task graph")
+
+    labels_of = {T: [] for T in tasks}  # ascending, i.e. N(T) reversed
+    buckets = deque([deque(sinks)])
+    order = []
+    k = 1
+
+    if instrument is not None:
+        t1 = time.perf_counter()
+        instrument.add_time("sinks", t1 - t0)
+        instrument.count("sinks", len(sinks))
+
+    # (b)
+    while k <= r:
+        while buckets and not buckets[0]:
+            buckets.popleft()
+        if not buckets:
+            raise ValueError("G is not a valid task graph")
+
+        T = buckets[0].popleft()
+        order.append(T)
+
+        ready = []
+        for p in G.P(T):  # O(e) over the whole run
+            labels_of[p].append(k)
+            remaining[p] -= 1
+            if remaining[p] == 0:
+                ready.append(p)
+
+        if ready:
+            # all of these share N(T)[0] = k, compare the rest of N(T) then id
+            if len(ready) > 1:
+                if instrument is not None:
+                    t = time.perf_counter()
+                ready.sort(key=lambda p: (labels_of[p][::-1], p))
+                if instrument is not None:
+                    instrument.add_time("sort", time.perf_counter() - t)
+                    instrument.count("sorts")
+                    instrument.count("tasks_sorted", len(ready))
+            buckets.append(deque(ready))
+            if trigger is not None:
+                for p in ready:
+                    trigger[p] = T
+
+        k += 1
+
+    if instrument is not None:
+        instrument.add_time("label", time.perf_counter() - t1)
+        instrument.count("edges_scanned", sum(map(len, labels_of.values())))
+    return order
+
+
+def reverse_csr(offsets, targets):
+    """Returns (pred_offsets, preds), the CSR form of the reversed graph."""
+    n = len(offsets) - 1
+
+    pred_offsets = array("i", bytes(4 * (n + 1)))
+    for v in targets:
+        pred_offsets[v + 1] += 1
+    for i in range(n):
+        pred_offsets[i + 1] += pred_offsets[i]
+
+    position = array("i", pred_offsets)
+    preds = array("i", bytes(4 * len(targets)))
+    for u in range(n):
+        for j in range(offsets[u], offsets[u + 1]):
+            v = targets[j]
+            preds[position[v]] = u
+            position[v] += 1
+
+    return pred_offsets, preds
+
+
+# Ready batches at least this big are ordered by _sort_ready_numpy.
+SORT_NUMPY_MIN = 64
+
+
+# Orders a batch of tasks made ready by the same label: by N(T), then index.
+# labels / offsets are NumPy views of coffman_graham_order_csr's arrays, so
+# N(T) of the whole batch is read as one padded matrix without per-task
+# Python: column j holds the j-th largest label of each task, or -1 (below
+# every label) when N(T) is shorter, so a list sorts before its extensions.
+# Column 0 is the shared label and is skipped.
+def _sort_ready_numpy(ready, labels, offsets) -> list:
+    ready = np.array(ready, np.int64)
+    end = offsets[ready + 1].astype(np.int64)
+    lengths = end - offsets[ready]
+
+    keys = [ready]
+    for j in range(int(lengths.max()) - 1, 0, -1):
+        has = lengths > j
+        keys.append(np.where(has, labels[np.where(has, end - 1 - j, 0)], -1))
+    return ready[np.lexsort(keys)].tolist()
+
+
+# Same bucketed labeling as coffman_graham_alpha_sethi, on CSR arrays. Returns
+# the task indices in label order, i.e. order[k - 1] is the task with alpha = k.
+# N(T) of every task is kept in one edge-sized array, task i owning the slice
+# offsets[i]:offsets[i + 1], so no per-task Python objects are allocated.
+def coffman_graham_order_csr(offsets, targets, instrument=None) -> array:
+    n = len(offsets) - 1
+    if instrument is not None:
+        t0 = time.perf_counter()
+    pred_offsets, preds = reverse_csr(offsets, targets)
+
+    remaining = array("i", [offsets[i + 1] - offsets[i] for i in range(n)])
+    fill = array("i", offsets)  # next free slot of each task's N(T)
+    labels = array("i", bytes(4 * len(targets)))
+
+    # (a)
+    sinks = deque(i for i in range(n) if remaining[i] == 0)
+    if not sinks:
+        raise ValueError("G is not a valid task graph")
+
+    buckets = deque([sinks])
+    order = array("i")
+    k = 1
+
+    # views, not copies: labels is filled in below
+    if np is not None and len(targets):
+        labels_view = np.frombuffer(labels, np.int32)
+        offsets_view = np.frombuffer(offsets, np.int32)
+        sort_numpy_min = SORT_NUMPY_MIN
+    else:
+        sort_numpy_min = n + 1
+
+    if instrument is not None:
+        t1 = time.perf_counter()
+        instrument.add_time("reverse", t1 - t0)
+        instrument.count("sinks", len(sinks))
+
+    # (b)
+    while k <= n:
+        while buckets and not buckets[0]:
+            buckets.popleft()
+        if not buckets:
+            raise ValueError("G is not a valid task graph")
+
+        T = buckets[0].popleft()
+        order.append(T)
+
+        ready = []
+        for j in range(pred_offsets[T], pred_offsets[T + 1]):
+            p = preds[j]
+            labels[fill[p]] = k
+            fill[p] += 1
+            remaining[p] -= 1
+            if remaining[p] == 0:
+                ready.append(p)
+
+        if ready:
+            if len(ready) > 1:
+                if instrument is not None:
+                    t = time.perf_counter()
+                if len(ready) >= sort_numpy_min:
+                    ready = _sort_ready_numpy(ready, labels_view, offsets_view)
+                else:
+                    ready.sort(key=lambda p: (labels[offsets[p] : offsets[p + 1]][::-1], p))
+                if instrument is not None:
+                    instrument.add_time("sort", time.perf_counter() - t)
+                    instrument.count("sorts")
+                    instrument.count("tasks_sorted", len(ready))
+            buckets.append(deque(ready))
+
+        k += 1
+
+    if instrument is not None:
+        instrument.add_time("label", time.perf_counter() - t1)
+        instrument.count("edges_scanned", len(targets))
+    return order
+
+
+def coffman_graham_algorithm_sethi(G: TaskGraph, instrument=None):
+    if isinstance(G, CompactTaskGraph):
+        order = coffman_graham_order_csr(G.offsets, G.targets, instrument)
+        if instrument is not None:
+            instrument.flush(engine="sethi", tasks=len(order), layout="csr")
+        task_id = G.task_id
+        return [task_id(i) for i in reversed(order)]
+
+    alpha = coffman_graham_alpha_sethi(G, instrument)
+    schedule = sorted(alpha.keys(), key=lambda task: alpha[task])
+    return schedule[::-1]
+
+
+COFFMAN_GRAHAM_ENGINES = {
+    "reference": coffman_graham_algorithm,
+    "sethi": coffman_graham_algorithm_sethi,
+}
+
+
+def coffman_graham(G: TaskGraph, engine="sethi", instrument=None):
+    if engine not in COFFMAN_GRAHAM_ENGINES:
+        raise ValueError(
+            f"Unknown engine {engine!r}, expected one of {sorted(COFFMAN_GRAHAM_ENGINES)}"
+        )
+    validate_task_graph(G)
+    if instrument is not None:
+        return COFFMAN_GRAHAM_ENGINES[engine](G, instrument=instrument)
+    return COFFMAN_GRAHAM_ENGINES[engine](G)
+
+
+# One step of coffman_graham_steps: task got label k. The candidates (every
+# unlabeled task whose successors are all labeled, task included), their N(T)
+# and the partial list L* are built from the run's shared state only when
+# asked for, so a step costs one small object.
+class CoffmanGrahamStep:
+    __slots__ = ("k", "task", "_sequence", "_ready", "_labels_of")
+
+    def __init__(self, k, sequence, ready, labels_of):
+        self.k = k
+        self.task = sequence[k - 1]
+        self._sequence = sequence
+        self._ready = ready
+        self._labels_of = labels_of
+
+    def N(self, T) -> list:
+        return self._labels_of[T][::-1]
+
+    @property
+    def candidates(self) -> dict:
+        return {T: self.N(T) for T in self._sequence[self.k - 1 : self._ready]}
+
+    # L* after this step, highest label first; the r - k unfilled slots in
+    # front of it are not included
+    @property
+    def partial(self) -> list:
+        return self._sequence[self.k - 1 :: -1]
+
+    def __repr__(self):
+        return f"CoffmanGrahamStep(k={self.k}, task={self.task!r})"
+
+
+# Runs the labeling one label at a time, yielding a CoffmanGrahamStep after
+# each. Same order as coffman_graham_alpha_sethi: the FIFO of ready buckets
+# read front to back is exactly the label order, so one append-only list
+# holds the labeled tasks followed by the current candidates.
+def coffman_graham_steps(G: TaskGraph):
+    tasks = G.tasks()
+    r = len(tasks)
+
+    remaining = {T: G.out_degree(T) for T in tasks}
+    labels_of = {T: [] for T in tasks}  # ascending, i.e. N(T) reversed
+
+    # (a)
+    sequence = sorted(T for T in tasks if remaining[T] == 0)
+    if not sequence:
+        raise ValueError("G is not a valid task graph")
+
+    # (b)
+    for k in range(1, r + 1):
+        if k > len(sequence):
+            raise ValueError("G is not a valid task graph")
+        T = sequence[k - 1]
+
+        ready = []
+        for p in G.P(T):
+            labels_of[p].append(k)
+            remaining[p] -= 1
+            if remaining[p] == 0:
+                ready.append(p)
+        if len(ready) > 1:
+            ready.sort(key=lambda p: (labels_of[p][::-1], p))
+
+        # candidates of this step are the ones ready before T was labeled
+        step = CoffmanGrahamStep(k, sequence, len(sequence), labels_of)
+        sequence += ready
+        yield step
+
+
+# Timeline produced by list_schedule. processors[p][mu] is the task P_{p+1}
+# runs at time step mu (idle slots hold `idle`), start[T] is the step T runs
+# in and makespan is the number of steps.
+class Schedule:
+    def __init__(self, processors, start, makespan, idle=None):
+        self.processors = processors
+        self.start = start
+        self.makespan = makespan
+        self.idle = idle
+
+    def __repr__(self):
+        return f"Schedule(m={len(self.processors)}, makespan={self.makespan})"
+
+    def at(self, mu) -> list:
+        return [p[mu] for p in self.processors if p[mu] != self.idle]
+
+
+# Event driven list scheduling of unit time tasks on m processors. Ready tasks
+# sit in a heap keyed by their position in L, and a task is pushed once, when
+# its last predecessor finishes, so the whole run is O((n + e) log n).
+def list_schedule(G: TaskGraph, L: list, m=2) -> Schedule:
+    if m < 1:
+        raise ValueError("m must be at least 1")
+
+    if isinstance(G, CompactTaskGraph):
+        order = array("i", [G.index_of(T) for T in L])
+        dense = list_schedule_csr(G.offsets, G.targets, order, m)
+        task_id = G.task_id
+        return Schedule(
+            [[task_id(i) if i >= 0 else None for i in p] for p in dense.processors],
+            {task_id(i): dense.start[i] for i in range(len(dense.start))},
+            dense.makespan,
+        )
+
+    if len(L) != G.number_of_tasks():
+        raise ValueError("L must list every task of G exactly once")
+
+    position = {T: i for i, T in enumerate(L)}
+    waiting = {T: 0 for T in L}  # number of unfinished predecessors
+    try:
+        for T in L:  # O(n + e)
+            for t in G.S(T):
+                waiting[t] += 1
+    except KeyError:
+        raise ValueError("G is not a valid task graph")
+
+    ready = [position[T] for T in L if waiting[T] == 0]
+    heapq.heapify(ready)
+
+    processors = [[] for _ in range(m)]
+    start = {}
+    mu = 0
+
+    while ready:
+        running = [heapq.heappop(ready) for _ in range(min(m, len(ready)))]
+
+        for p in range(m):
+            if p < len(running):
+                T = L[running[p]]
+                start[T] = mu
+                processors[p].append(T)
+            else:
+                processors[p].append(None)
+
+        # tasks freed here become ready at mu + 1, after this step's pops
+        for i in running:
+            for t in G.S(L[i]):
+                waiting[t] -= 1
+                if waiting[t] == 0:
+                    heapq.heappush(ready, position[t])
+
+        mu += 1
+
+    if len(start) != len(L):
+        raise ValueError("G is not a valid task graph")
+
+    return Schedule(processors, start, mu)
+
+
+# list_schedule_csr one step at a time: yields the task indices started at
+# each step, in priority order (the p-th runs on P_{p+1}).
+def iter_list_schedule_csr(offsets, targets, order, m=2):
+    n = len(offsets) - 1
+    if len(order) != n:
+        raise ValueError("order must list every task exactly once")
+
+    position = array("i", bytes(4 * n))
+    for i, T in enumerate(order):
+        position[T] = i
+
+    waiting = array("i", bytes(4 * n))
+    for t in targets:
+        waiting[t] += 1
+
+    ready = [position[T] for T in range(n) if waiting[T] == 0]
+    heapq.heapify(ready)
+    scheduled = 0
+
+    while ready:
+        running = [order[heapq.heappop(ready)] for _ in range(min(m, len(ready)))]
+        yield running
+        scheduled += len(running)
+
+        for T in running:
+            for j in range(offsets[T], offsets[T + 1]):
+                t = targets[j]
+                waiting[t] -= 1
+                if waiting[t] == 0:
+                    heapq.heappush(ready, position[t])
+
+    if scheduled != n:
+        raise ValueError("G is not a valid task graph")
+
+
+# list_schedule on CSR arrays. order holds task indices in priority order; the
+# result uses task indices too, with -1 for idle slots and start as an array.
+def list_schedule_csr(offsets, targets, order, m=2) -> Schedule:
+    n = len(offsets) - 1
+    processors = [array("i") for _ in range(m)]
+    start = array("i", [-1]) * n
+    mu = 0
+
+    for running in iter_list_schedule_csr(offsets, targets, order, m):
+        for p in range(m):
+            if p < len(running):
+                T = running[p]
+                start[T] = mu
+                processors[p].append(T)
+            else:
+                processors[p].append(-1)
+        mu += 1
+
+    return Schedule(processors, start, mu, idle=-1)
+
+
+def coffman_graham_schedule(
+    G: TaskGraph, m=2, engine="sethi", reduce=False
+) -> Schedule:
+    # Coffman-Graham is only optimal on transitively reduced graphs; dropping
+    # redundant edges keeps every precedence, so the schedule is valid for G
+    if reduce:
+        G, _ = transitive_reduction(G)
+    return list_schedule(G, coffman_graham(G, engine), m)
+
+
+# Exact minimum makespan of G's unit time tasks on m processors, for checking
+# the heuristics on small graphs. Exponential in the worst case; graphs of up
+# to ~40 tasks usually take well under a second.
+#
+# A state is the set of finished tasks as a bitmask (always closed under
+# predecessors). Some optimal schedule never idles a processor while a task
+# is ready, so every step runs min(m, ready) tasks. Iterative deepening on
+# the makespan from a lower bound up to the Coffman-Graham makespan, with a
+# depth first search that remembers, per state, the largest number of steps
+# known not to be enough. Pruning:
+#   - tasks with the same predecessors and successors are interchangeable,
+#     so only the lowest-index ready ones of each class are ever chosen;
+#   - the remaining tasks are an upset, so their heights h(T) (tasks on the
+#     longest path from T to a sink) never change, and the ones with
+#     h(T) >= h all have to start in the first steps - h + 1 steps:
+#         steps >= h - 1 + ceil(|{T : h(T) >= h}| / m)
+#     which covers both ceil(n / m) (h = 1) and the critical path.
+def optimal_schedule(G: TaskGraph, m=2) -> Schedule:
+    if m < 1:
+        raise ValueError("m must be at least 1")
+    validate_task_graph(G)
+
+    tasks = sorted(G.tasks())
+    n = len(tasks)
+    index = {T: i for i, T in enumerate(tasks)}
+    succ_mask = [0] * n
+    pred_mask = [0] * n
+    for i, T in enumerate(tasks):
+        for t in G.S(T):
+            succ_mask[i] |= 1 << index[t]
+            pred_mask[index[t]] |= 1 << i
+
+    height = [0] * n
+    for T in reversed(topological_order(G)):
+        i = index[T]
+        height[i] = 1 + max((height[index[t]] for t in G.S(T)), default=0)
+    levels = max(height, default=0)
+    height_mask = [0] * (levels + 1)
+    for i in range(n):
+        height_mask[height[i]] |= 1 << i
+
+    # interchangeable tasks, as lists of indices in increasing order
+    classes = {}
+    for i in range(n):
+        classes.setdefault((pred_mask[i], succ_mask[i]), []).append(i)
+    class_of = [None] * n
+    for members in classes.values():
+        for i in members:
+            class_of[i] = members
+
+    full = (1 << n) - 1
+
+    def lower_bound(done):
+        remaining = full & ~done
+        bound = count = 0
+        for h in range(levels, 0, -1):
+            count += (remaining & height_mask[h]).bit_count()
+            if count:
+                bound = max(bound, h - 1 + -(-count // m))
+        return bound
+
+    def choices(done):
+        # one representative set of min(m, ready) ready tasks per way of
+        # splitting the picks over the classes
+        groups = []
+        seen = set()
+        for i in range(n):
+            if not done >> i & 1 and (pred_mask[i] & ~done) == 0:
+                members = class_of[i]
+                if id(members) not in seen:
+                    seen.add(id(members))
+                    groups.append(
+                        [j for j in members if not done >> j & 1]
+                    )
+        # highest tasks first, so good schedules are found early
+        groups.sort(key=lambda g: -height[g[0]])
+        k = min(m, sum(map(len, groups)))
+
+        def pick(g, left, mask):
+            if left == 0:
+                yield mask
+                return
+            if g == len(groups):
+                return
+            members = groups[g]
+            for c in range(min(left, len(members)), -1, -1):
+                taken = mask
+                for j in members[:c]:
+                    taken |= 1 << j
+                yield from pick(g + 1, left - c, taken)
+
+        return pick(0, k, 0)
+
+    not_enough = {}  # state -> most steps known to be too few
+    step = {}  # state -> tasks run next on a schedule found within budget
+
+    def search(done, steps):
+        if done == full:
+            return True
+        if steps < lower_bound(done) or not_enough.get(done, -1) >= steps:
+            return False
+        for chosen in choices(done):
+            if search(done | chosen, steps - 1):
+                step[done] = chosen
+                return True
+        not_enough[done] = steps
+        return False
+
+    incumbent = coffman_graham_schedule(G, m) if n else None
+    for makespan in range(lower_bound(0), incumbent.makespan if n else 0):
+        if search(0, makespan):
+            break
+    else:
+        return incumbent if n else Schedule([[] for _ in range(m)], {}, 0)
+
+    processors = [[] for _ in range(m)]
+    start = {}
+    done = 0
+    mu = 0
+    while done != full:
+        chosen = step[done]
+        running = [tasks[i] for i in range(n) if chosen >> i & 1]
+        for p in range(m):
+            T = running[p] if p < len(running) else None
+            processors[p].append(T)
+            if T is not None:
+                start[T] = mu
+        done |= chosen
+        mu += 1
+    return Schedule(processors, start, mu)
+
+
+class InvalidTaskGraphError(ValueError):
+    def __init__(self, cycle=None, dangling=None):
+        self.cycle = cycle
+        self.dangling = dangling
+
+        message = "G is not a valid task graph"
+        if dangling:
+            message += f": successors {dangling} are not in the set of tasks"
+        elif cycle:
+            message += f": cycle {' -> '.join(str(T) for T in cycle)}"
+        super().__init__(message)
+
+
+# Kahn's algorithm, O(n + e). Raises InvalidTaskGraphError naming the
+# successors that are not tasks, or one cycle of G.
+def topological_order(G: TaskGraph) -> list:
+    indegree = {T: 0 for T in G.tasks()}
+    dangling = []
+    for T in G.tasks():
+        for t in G.S(T):
+            if t in indegree:
+                indegree[t] += 1
+            else:
+                dangling.append(t)
+
+    if dangling:
+        raise InvalidTaskGraphError(dangling=sorted(set(dangling)))
+
+    queue = deque(T for T in G.tasks() if indegree[T] == 0)
+    order = []
+    while queue:
+        T = queue.popleft()
+        order.append(T)
+        for t in G.S(T):
+            indegree[t] -= 1
+            if indegree[t] == 0:
+                queue.append(t)
+
+    if len(order) != len(indegree):
+        raise InvalidTaskGraphError(cycle=_find_cycle(G, indegree))
+    return order
+
+
+# Every task Kahn could not remove still has a predecessor that was not
+# removed either, so walking those predecessors backwards from any of them
+# must revisit a task, closing a cycle.
+def _find_cycle(G: TaskGraph, indegree: dict) -> list:
+    left = {T for T, d in indegree.items() if d > 0}
+    predecessor = {}
+    for T in left:
+        for t in G.S(T):
+            if t in left:
+                predecessor[t] = T
+
+    T = next(iter(left))
+    seen = {}
+    path = []
+    while T not in seen:
+        seen[T] = len(path)
+        path.append(T)
+        T = predecessor[T]
+
+    cycle = path[seen[T] :][::-1]
+    return cycle + [cycle[0]]
+
+
+# Checks G once before labeling; the result is cached on G until add_task or
+# add_successor mutates it.
+def validate_task_graph(G: TaskGraph):
+    if getattr(G, "_validated", False):
+        return
+    if isinstance(G, CompactTaskGraph):
+        # targets are range checked on construction, only cycles are possible
+        if not _csr_is_acyclic(G.offsets, G.targets):
+            topological_order(G)  # raises with the cycle
+    else:
+        topological_order(G)
+    G._validated = True
+
+
+def _csr_is_acyclic(offsets, targets) -> bool:
+    n = len(offsets) - 1
+    indegree = array("i", bytes(4 * n))
+    for t in targets:
+        indegree[t] += 1
+
+    stack = [T for T in range(n) if indegree[T] == 0]
+    removed = 0
+    while stack:
+        T = stack.pop()
+        removed += 1
+        for j in range(offsets[T], offsets[T + 1]):
+            t = targets[j]
+            indegree[t] -= 1
+            if indegree[t] == 0:
+                stack.append(t)
+    return removed == n
+
+
+# Reachability as Python int bitsets over a topological order: bit i of
+# reach[j] is set when the i-th task of `order` is reachable from the j-th.
+# Tasks are visited in reverse order so reach of every successor is final.
+# An edge T -> t is redundant when t is reachable through another successor
+# of T, and any such successor comes before t in the order, so visiting the
+# successors by increasing position finds it in one pass. O(n * e / w).
+def _reachability(G: TaskGraph, order: list):
+    position = {T: i for i, T in enumerate(order)}
+    reach = [0] * len(order)
+    kept = {}
+    removed = 0
+
+    for j in range(len(order) - 1, -1, -1):
+        T = order[j]
+        covered = 0
+        direct = 0
+        for i in sorted(position[t] for t in G.S(T)):
+            bit = 1 << i
+            if (covered | direct) & bit:
+                removed += 1
+            else:
+                direct |= bit
+            covered |= reach[i]
+
+        reach[j] = covered | direct
+        kept[T] = direct
+
+    return position, reach, kept, removed
+
+
+def _graph_like(G, successors):
+    if isinstance(G, CompactTaskGraph):
+        return CompactTaskGraph.from_task_graph(
+            TaskGraph(tasks=G.tasks(), successors=successors)
+        )
+    return TaskGraph(tasks=G.tasks(), successors=successors)
+
+
+def transitive_reduction(G: TaskGraph):
+    """Returns (reduced graph, number of edges removed)."""
+    order = topological_order(G)
+    position, _, kept, removed = _reachability(G, order)
+
+    successors = {}
+    for T in order:
+        direct = kept[T]
+        S_T = []
+        for t in G.S(T):  # keep the original successor order
+            bit = 1 << position[t]
+            if direct & bit:
+                S_T.append(t)
+                direct ^= bit  # only the first of duplicate edges
+        successors[T] = S_T
+
+    return _graph_like(G, successors), removed
+
+
+def transitive_closure(G: TaskGraph):
+    order = topological_order(G)
+    _, reach, _, _ = _reachability(G, order)
+
+    successors = {}
+    for j, T in enumerate(order):
+        bits = reach[j]
+        S_T = []
+        while bits:
+            low = bits & -bits
+            S_T.append(order[low.bit_length() - 1])
+            bits ^= low
+        successors[T] = S_T
+
+    return _graph_like(G, successors)
+
+
+# Result of coffman_graham_batch. Graph g owns the global task indices
+# task_offsets[g]:task_offsets[g + 1]. For those tasks, order holds the
+# priority list L (global indices, highest label first), start and processor
+# the time step and processor each task runs on, and makespan[g] the length of
+# the schedule. task_ids maps global indices back to task ids.
+class BatchSchedule:
+    def __init__(self, task_offsets, order, start, processor, makespan, task_ids):
+        self.task_offsets = task_offsets
+        self.order = order
+        self.start = start
+        self.processor = processor
+        self.makespan = makespan
+        self.task_ids = task_ids
+
+    def __len__(self):
+        return len(self.task_offsets) - 1
+
+    def _task_id(self, T):
+        if self.task_ids is None:
+            return T - self.task_offsets[bisect_left(self.task_offsets, T + 1) - 1]
+        return self.task_ids[T]
+
+    def L(self, g) -> list:
+        lo, hi = self.task_offsets[g], self.task_offsets[g + 1]
+        return [self._task_id(T) for T in self.order[lo:hi]]
+
+    def schedule(self, g, m=2) -> Schedule:
+        lo, hi = self.task_offsets[g], self.task_offsets[g + 1]
+        processors = [[None] * self.makespan[g] for _ in range(m)]
+        start = {}
+        for T in range(lo, hi):
+            task = self._task_id(T)
+            processors[self.processor[T]][self.start[T]] = task
+            start[task] = self.start[T]
+        return Schedule(processors, start, self.makespan[g])
+
+
+# Labels and schedules many small graphs in one call. The graphs are packed
+# into one CSR graph over disjoint index ranges and then run in lockstep with
+# NumPy (see _batch_numpy): step s labels the s-th task of every graph at
+# once, and time step mu schedules every graph's mu-th step at once, so the
+# Python overhead is per step of the largest graph, not per task. Without
+# NumPy each graph goes through coffman_graham_order_csr and
+# list_schedule_csr in turn.
+def coffman_graham_batch(graphs, m=2) -> BatchSchedule:
+    task_offsets = array("i", [0])
+    task_ids = array("q")
+    out_degree = array("q")
+    flat = array("q")  # successors, as ids or global indices
+    shifts = []  # (edges, id - global index) per graph
+
+    for G in graphs:
+        base = len(task_ids)
+        if isinstance(G, CompactTaskGraph):
+            task_ids.extend(G.task_id(i) for i in range(len(G)))
+            out_degree.extend(map(operator.sub, G.offsets[1:], G.offsets[:-1]))
+            flat.extend(array("q", G.targets))  # int32 indices, flat is int64
+            shifts.append((len(G.targets), -base))
+        else:
+            tasks = sorted(G.tasks())
+            S = G._successors.__getitem__ if isinstance(G, TaskGraph) else G.S
+            successors = list(map(S, tasks))
+            edges = list(chain.from_iterable(successors))
+            task_ids.extend(tasks)
+            out_degree.extend(map(len, successors))
+            try:
+                contiguous = tasks[-1] - tasks[0] == len(tasks) - 1
+            except (IndexError, TypeError):
+                contiguous = False
+
+            if contiguous and (
+                not edges or tasks[0] <= min(edges) and max(edges) <= tasks[-1]
+            ):
+                flat.extend(edges)
+                shifts.append((len(edges), tasks[0] - base))
+            else:
+                index = dict(zip(tasks, range(base, base + len(tasks))))
+                dangling = [t for t in edges if t not in index]
+                if dangling:
+                    raise InvalidTaskGraphError(dangling=sorted(set(dangling)))
+                flat.extend(map(index.__getitem__, edges))
+                shifts.append((len(edges), 0))
+        task_offsets.append(len(task_ids))
+
+    if np is not None:
+        counts, shift = zip(*shifts) if shifts else ((), ())
+        targets = np.frombuffer(flat, np.int64) - np.repeat(shift, counts)
+        offsets = np.zeros(len(out_degree) + 1, np.int64)
+        np.cumsum(np.frombuffer(out_degree, np.int64), out=offsets[1:])
+    else:
+        targets = array("i")
+        j = 0
+        for count, shift in shifts:
+            targets.extend(t - shift for t in flat[j : j + count])
+            j += count
+        offsets = array("i", [0, *accumulate(out_degree)])
+
+    return _batch_csr(task_offsets, offsets, targets, m, task_ids)
+
+
+# Same as coffman_graham_batch for graphs already packed as one edge list.
+# sources and targets are global task indices, graph g owning the indices
+# task_offsets[g]:task_offsets[g + 1]; task ids are the local indices.
+def coffman_graham_batch_arrays(task_offsets, sources, targets, m=2) -> BatchSchedule:
+    if not isinstance(task_offsets, array) or task_offsets.typecode != "i":
+        task_offsets = array("i", task_offsets)
+    if len(sources) != len(targets):
+        raise ValueError("sources and targets must have the same length")
+
+    if np is None:
+        for u, v in zip(sources, targets):
+            g = bisect_left(task_offsets, u + 1) - 1
+            if not task_offsets[g] <= v < task_offsets[g + 1]:
+                raise ValueError(f"edge ({u}, {v}) crosses graphs")
+        C = CompactTaskGraph.from_edge_arrays(task_offsets[-1], sources, targets)
+        return _batch_csr(task_offsets, C.offsets, C.targets, m, None)
+
+    bounds = np.frombuffer(task_offsets, np.int32).astype(np.int64)
+    sources = np.asarray(sources, np.int64)
+    targets = np.asarray(targets, np.int64)
+    n = int(bounds[-1])
+    if len(sources) and (
+        min(sources.min(), targets.min()) < 0 or max(sources.max(), targets.max()) >= n
+    ):
+        raise ValueError(f"task indices must be in [0, {n})")
+    graph = np.searchsorted(bounds, sources, side="right") - 1
+    crossing = (targets < bounds[graph]) | (targets >= bounds[graph + 1])
+    if crossing.any():
+        j = int(np.argmax(crossing))
+        raise ValueError(f"edge ({sources[j]}, {targets[j]}) crosses graphs")
+
+    # CSR by a stable sort on the source, keeping the input order per source
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(n + 1, np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+    return _batch_csr(task_offsets, offsets, targets[order], m, None)
+
+
+def _batch_csr(task_offsets, offsets, targets, m, task_ids) -> BatchSchedule:
+    if m < 1:
+        raise ValueError("m must be at least 1")
+
+    if np is not None:
+        offsets = np.asarray(offsets, np.int64)
+        targets = np.asarray(targets, np.int64)
+        result = _batch_numpy(task_offsets, offsets, targets, m)
+        if result is not None:
+            return BatchSchedule(task_offsets, *map(_int32_array, result), task_ids)
+        offsets, targets = _int32_array(offsets), _int32_array(targets)
+
+    n = len(offsets) - 1
+    order = array("i", bytes(4 * n))
+    start = array("i", bytes(4 * n))
+    processor = array("i", bytes(4 * n))
+    makespan = array("i")
+
+    for g in range(len(task_offsets) - 1):
+        lo, hi = task_offsets[g], task_offsets[g + 1]
+        first = offsets[lo]
+        local_offsets = array("i", [o - first for o in offsets[lo : hi + 1]])
+        local_targets = array("i", [t - lo for t in targets[first : offsets[hi]]])
+
+        try:
+            L = coffman_graham_order_csr(local_offsets, local_targets)[::-1]
+            steps = iter_list_schedule_csr(local_offsets, local_targets, L, m)
+            mu = 0
+            for mu, running in enumerate(steps, start=1):
+                for p, T in enumerate(running):
+                    start[lo + T] = mu - 1
+                    processor[lo + T] = p
+        except ValueError:
+            raise InvalidTaskGraphError()
+        order[lo:hi] = array("i", [lo + T for T in L])
+        makespan.append(mu)
+
+    return BatchSchedule(task_offsets, order, start, processor, makespan, task_ids)
+
+
+# Concatenation of the ranges starts[i]:ends[i], as one index array.
+def _ranges(starts, ends):
+    lengths = ends - starts
+    shift = starts - (np.cumsum(lengths) - lengths)
+    return np.repeat(shift, lengths) + np.arange(int(lengths.sum()))
+
+
+# Rank of each element within its run of equal values of the grouped array
+# `keys` (0 for the first of each run), and the first index of each run.
+def _rank_in_runs(keys):
+    if not len(keys):
+        return keys, keys
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    lengths = np.diff(np.r_[first, len(keys)])
+    return np.arange(len(keys)) - np.repeat(first, lengths), first
+
+
+# Lockstep labeling and scheduling of every packed graph. Labels are only
+# compared within a graph, and at step s every graph hands out label s + 1,
+# so one step is a few gathers and scatters over all graphs at once:
+#
+#   - seq[lo:hi] is graph g's bucket FIFO (its label order): the sinks by
+#     index, then each batch of newly ready tasks as it appears;
+#   - step s takes T = seq[lo + s] in every graph with more than s tasks,
+#     appends s + 1 to N(p) of every predecessor p, and appends the tasks
+#     this made ready, ordered per graph by one np.lexsort on (graph, N(p)
+#     minus its shared first label, index) as in _sort_ready_numpy.
+#
+# Scheduling keeps every graph's ready tasks in one array sorted by
+# (graph, position in L) and starts the first m of each graph per step.
+# Returns (order, start, processor, makespan), or None when an edge is
+# repeated, which the per-graph engines handle.
+def _batch_numpy(task_offsets, offsets, targets, m):
+    bounds = np.frombuffer(task_offsets, np.int32).astype(np.int64)
+    sizes = np.diff(bounds)
+    n, e = len(offsets) - 1, len(targets)
+    B = len(sizes)
+    if n == 0:
+        return [], [], [], np.zeros(B, np.int64)
+
+    out_degree = np.diff(offsets)
+    sources = np.repeat(np.arange(n), out_degree)
+    if e > 1:
+        edges = np.sort(sources * n + targets)
+        if (edges[1:] == edges[:-1]).any():
+            return None
+    graph_of = np.repeat(np.arange(B), sizes)
+
+    # reverse CSR, each task's predecessors in increasing index order
+    preds = sources[np.argsort(targets, kind="stable")]
+    pred_offsets = np.zeros(n + 1, np.int64)
+    np.cumsum(np.bincount(targets, minlength=n), out=pred_offsets[1:])
+
+    # labeling
+    labels = np.zeros(e, np.int64)
+    fill = offsets[:-1].copy()
+    remaining = out_degree.copy()
+    seq = np.empty(n, np.int64)
+    tail = bounds[:-1].copy()
+
+    def append(ready):  # grouped by graph, in the order they join the FIFO
+        g = graph_of[ready]
+        rank, first = _rank_in_runs(g)
+        seq[tail[g] + rank] = ready
+        tail[g[first]] += np.diff(np.r_[first, len(g)])
+
+    append(np.flatnonzero(remaining == 0))
+    by_size = np.argsort(-sizes, kind="stable")
+    largest = sizes[by_size]
+
+    for s in range(int(sizes.max())):
+        active = by_size[: np.searchsorted(-largest, -s, side="left")]
+        position = bounds[active] + s
+        if (tail[active] <= position).any():
+            raise InvalidTaskGraphError()
+        T = seq[position]
+
+        p = preds[_ranges(pred_offsets[T], pred_offsets[T + 1])]
+        if not len(p):
+            continue
+        labels[fill[p]] = s + 1
+        fill[p] += 1
+        remaining[p] -= 1
+        ready = p[remaining[p] == 0]
+        if not len(ready):
+            continue
+
+        # only runs of more than one task of the same graph need ordering
+        g = graph_of[ready]
+        shared = np.r_[False, g[1:] == g[:-1]]
+        if shared.any():
+            run = np.cumsum(~shared)
+            shared[:-1] |= shared[1:]
+            tied = ready[shared]
+            end = offsets[tied + 1]
+            lengths = end - offsets[tied]
+            keys = [tied]
+            for j in range(int(lengths.max()) - 1, 0, -1):
+                has = lengths > j
+                keys.append(np.where(has, labels[np.where(has, end - 1 - j, 0)], -1))
+            keys.append(run[shared])
+            ready[shared] = tied[np.lexsort(keys)]
+        append(ready)
+
+    # L of graph g is its FIFO reversed
+    local = np.arange(n) - bounds[graph_of]
+    order = seq[bounds[graph_of] + sizes[graph_of] - 1 - local]
+    position = np.empty(n, np.int64)
+    position[order] = local
+
+    # list scheduling: pool holds graph * W + position of every ready task,
+    # sorted, so each graph's next m tasks are the front of its run
+    W = int(sizes.max())
+    waiting = np.bincount(targets, minlength=n)
+    ready = np.flatnonzero(waiting == 0)
+    pool = np.sort(graph_of[ready] * W + position[ready])
+    start = np.zeros(n, np.int64)
+    processor = np.zeros(n, np.int64)
+    makespan = np.zeros(B, np.int64)
+    left = sizes.copy()
+    active = np.flatnonzero(left)
+    mu = 0
+
+    while len(active):
+        first = np.searchsorted(pool, active * W)
+        count = np.minimum(np.diff(np.r_[first, len(pool)]), m)
+        chosen = _ranges(first, first + count)
+        keys = pool[chosen]
+        graph = np.repeat(active, count)
+        T = order[bounds[graph] + keys - graph * W]
+        start[T] = mu
+        processor[T] = chosen - np.repeat(first, count)
+        pool = np.delete(pool, chosen)
+
+        makespan[active] = mu + 1
+        left[active] -= count
+        active = active[left[active] > 0]
+
+        successors = targets[_ranges(offsets[T], offsets[T + 1])]
+        if len(successors):
+            t, times = np.unique(successors, return_counts=True)
+            waiting[t] -= times
+            t = t[waiting[t] == 0]
+            if len(t):
+                new = np.sort(graph_of[t] * W + position[t])
+                pool = np.insert(pool, np.searchsorted(pool, new), new)
+        mu += 1
+
+    return order, start, processor, makespan
+
+
+# Components are returned with their tasks in G.tasks() order, ordered by
+# their first task. With NumPy the edges are read into arrays and joined by
+# _component_roots, otherwise (or for ids NumPy can't hold, or edges to tasks
+# outside G) this is a breadth first search over S(T) and P(T), O(n + e).
+def weakly_connected_components(G: TaskGraph) -> list:
+    if np is not None and isinstance(G, TaskGraph):
+        components = _components_numpy(G)
+        if components is not None:
+            return components
+
+    component_of = {}
+    count = 0
+    for T in G.tasks():
+        if T in component_of:
+            continue
+        component_of[T] = count
+        frontier = [T]
+        while frontier:
+            v = frontier.pop()
+            for t in chain(G.S(v), G.P(v)):
+                if t not in component_of:
+                    component_of[t] = count
+                    frontier.append(t)
+        count += 1
+
+    components = [[] for _ in range(count)]
+    for T in G.tasks():
+        components[component_of[T]].append(T)
+    return components
+
+
+def _components_numpy(G: TaskGraph):
+    tasks = list(G.tasks())
+    n = len(tasks)
+    if not n:
+        return []
+    successors = list(map(G._successors.__getitem__, tasks))
+    counts = np.fromiter(map(len, successors), np.int64, n)
+    try:
+        ids = np.fromiter(tasks, np.int64, n)
+        heads = np.fromiter(chain.from_iterable(successors), np.int64, counts.sum())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+    by_id = np.argsort(ids)
+    position = np.searchsorted(ids, heads, sorter=by_id)
+    if len(heads) and (position.max() >= n or (ids[by_id[position]] != heads).any()):
+        return None
+
+    root = _component_roots(
+        n, np.repeat(np.arange(n), counts), by_id[position]
+    )
+    grouped = np.argsort(root, kind="stable")
+    ordered = ids[grouped].tolist()
+    bounds = [0, *(np.flatnonzero(np.diff(root[grouped])) + 1).tolist(), n]
+    return [ordered[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+# Union-find over range(n) for the edges sources[j] - targets[j], returning
+# the smallest index in each task's component. Every round hooks the larger
+# root of each edge that still joins two components onto the smaller one,
+# then pointer jumps until every task points at its root.
+def _component_roots(n, sources, targets):
+    root = np.arange(n)
+    while True:
+        a, b = root[sources], root[targets]
+        joins = a != b
+        if not joins.any():
+            return root
+        sources, targets = sources[joins], targets[joins]
+        a, b = a[joins], b[joins]
+        np.minimum.at(root, np.maximum(a, b), np.minimum(a, b))
+        while True:
+            up = root[root]
+            if np.array_equal(up, root):
+                break
+            root = up
+
+
+_worker_graph = None
+
+
+def _init_component_worker(G):
+    global _worker_graph
+    _worker_graph = G
+
+
+def _label_components(components) -> tuple:
+    order, trigger = [], {}
+    for tasks in components:
+        order.extend(_sethi_order(_worker_graph, tasks, trigger))
+    return order, [trigger.get(T) for T in order]
+
+
+# Coffman-Graham labeling with the weakly connected components of G labeled
+# in a process pool. Components never compare against each other except
+# through the global bucket order, and every non-sink task lands in the bucket
+# of its trigger, the successor whose labeling made it ready. Triggers and the
+# order inside each bucket only depend on the task's own component, so the
+# workers return (label order, trigger) per component and the global list is
+# rebuilt with one FIFO pass: the sinks in id order, then for each
+# labeled task the tasks it triggered. The result is exactly coffman_graham(G).
+# A cycle or dangling edge leaves its component short of sinks or ready tasks
+# and the labeling fails, so G is only validated then, to name the culprit.
+def coffman_graham_parallel(G: TaskGraph, workers=None, min_job_size=20000) -> list:
+    try:
+        components = weakly_connected_components(G)
+    except ValueError:
+        validate_task_graph(G)
+        raise
+
+    # big components get their own job, small ones are packed up to
+    # min_job_size tasks so IPC stays small next to the labeling work
+    jobs = []
+    pending, pending_size = [], 0
+    for tasks in sorted(components, key=len, reverse=True):
+        if len(tasks) >= min_job_size:
+            jobs.append([tasks])
+            continue
+        pending.append(tasks)
+        pending_size += len(tasks)
+        if pending_size >= min_job_size:
+            jobs.append(pending)
+            pending, pending_size = [], 0
+    if pending:
+        jobs.append(pending)
+
+    try:
+        if len(jobs) <= 1 or workers == 1:
+            _init_component_worker(G)
+            results = [_label_components(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_component_worker,
+                initargs=(G,),
+            ) as pool:
+                results = list(pool.map(_label_components, jobs))
+    except ValueError:
+        validate_task_graph(G)
+        raise
+    finally:
+        _init_component_worker(None)
+
+    triggered = {}
+    for order, trigger in results:
+        for T, t in zip(order, trigger):
+            if t is None:
+                continue
+            if t in triggered:
+                triggered[t].append(T)
+            else:
+                triggered[t] = [T]
+
+    queue = deque(sorted(T for T in G.tasks() if not G.out_degree(T)))
+    L = []
+    while queue:
+        T = queue.popleft()
+        L.append(T)
+        queue.extend(triggered.get(T, ()))
+
+    return L[::-1]
+
+
+EDGE_LIST_FORMATS = ("csv", "tsv", "jsonl", "edgelist")
+
+
+def _edge_list_format(source, format):
+    if format is not None:
+        if format not in EDGE_LIST_FORMATS:
+            raise ValueError(
+                f"Unknown format {format!r}, expected one of {EDGE_LIST_FORMATS}"
+            )
+        return format
+    name = source if isinstance(source, (str, os.PathLike)) else ""
+    suffix = os.path.splitext(os.fspath(name))[1].lower()
+    return {".csv": "csv", ".tsv": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(
+        suffix, "edgelist"
+    )
+
+
+# Fixed size blocks of whole lines; the partial last line is carried over.
+def _read_line_blocks(f, chunk_size):
+    rest = b""
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            break
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            rest = block
+            continue
+        rest = block[cut:]
+        yield block[:cut]
+    if rest.strip():
+        yield rest + b"\n"
+
+
+# Matches a block made only of "u v" lines. Anything else (a task-only line,
+# a third field, a comment) takes the line by line path. The quantifiers are
+# possessive so the match never backtracks, about a tenth of the parse time.
+_EDGE_LINES = re.compile(rb"(?:[ \t]*+-?[0-9]++[ \t]++-?[0-9]++[ \t]*+\r?+\n)*+")
+
+
+def _parse_delimited_block(block, separator, first):
+    if separator is not None:
+        block = block.replace(separator, b" ")
+    if first:
+        # drop a header line such as "source,target"
+        line = block[: block.find(b"\n")].split()
+        if line and not line[0].lstrip(b"-").isdigit():
+            block = block[block.find(b"\n") + 1 :]
+
+    tasks = array("q")
+    if _EDGE_LINES.fullmatch(block):
+        # every line is exactly "u v", let split() and int() do all the work
+        values = array("q", map(int, block.split()))
+        return tasks, values[0::2], values[1::2]
+
+    sources, targets = array("q"), array("q")
+    for line in block.splitlines():
+        fields = line.split(b"#", 1)[0].split()
+        if len(fields) == 1:
+            tasks.append(int(fields[0]))
+        elif fields:
+            sources.append(int(fields[0]))
+            targets.append(int(fields[1]))
+    return tasks, sources, targets
+
+
+def _parse_jsonl_block(block):
+    tasks, sources, targets = array("q"), array("q"), array("q")
+    for line in block.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                if "task" in record:
+                    tasks.append(record["task"])
+                    continue
+                record = (record["source"], record["target"])
+            if len(record) == 1:
+                tasks.append(record[0])
+            else:
+                sources.append(record[0])
+                targets.append(record[1])
+        except (ValueError, LookupError, TypeError, OverflowError):
+            text = line.decode("utf-8", "replace").strip()
+            raise ValueError(f"bad edge list record {text!r}") from None
+    return tasks, sources, targets
+
+
+# Streams an edge list in chunk_size byte blocks and yields (tasks, sources,
+# targets) arrays per block. Lines are "u,v" (csv), "u<TAB>v" (tsv), "u v"
+# (edgelist) or [u, v] / {"source": u, "target": v} (jsonl); a line with a
+# single task id adds a task without edges. source is a path, a binary file
+# object or "-" for stdin.
+def iter_edge_chunks(source="-", format=None, chunk_size=1 << 20):
+    format = _edge_list_format(source, format)
+    separator = {"csv": b",", "tsv": b"\t"}.get(format)
+
+    if source == "-":
+        f, close = sys.stdin.buffer, False
+    elif isinstance(source, (str, os.PathLike)):
+        f, close = open(source, "rb"), True
+    else:
+        f, close = source, False
+
+    try:
+        first = True
+        for block in _read_line_blocks(f, chunk_size):
+            if format == "jsonl":
+                yield _parse_jsonl_block(block)
+            else:
+                yield _parse_delimited_block(block, separator, first)
+            first = False
+    finally:
+        if close:
+            f.close()
+
+
+def load_task_graph(source="-", format=None, chunk_size=1 << 20) -> TaskGraph:
+    G = TaskGraph()
+    for tasks, sources, targets in iter_edge_chunks(source, format, chunk_size):
+        for t in tasks:
+            G.add_task(t)
+        for u, v in zip(sources, targets):
+            G.add_successor(u, v)
+    if G.tasks():
+        G._current_task_id = max(G.tasks()) + 1
+    return G
+
+
+# Loads straight into a CompactTaskGraph without a Python object per task or
+# edge. With NumPy (_load_compact_numpy) edges are buffered as two int32
+# indices, and the CSR arrays are built by a counting sort one block at a
+# time. Without NumPy, edges are buffered as 8 byte ids, then mapped to dense
+# indices with a presence bitmap over [min id, max id] when that range is
+# small, or with a sorted id array and binary search when the ids are sparse.
+def load_compact_task_graph(
+    source="-", format=None, chunk_size=1 << 20
+) -> CompactTaskGraph:
+    chunks = iter_edge_chunks(source, format, chunk_size)
+    if np is not None:
+        return _load_compact_numpy(chunks)
+
+    tasks, sources, targets = array("q"), array("q"), array("q")
+    for chunk_tasks, chunk_sources, chunk_targets in chunks:
+        tasks.extend(chunk_tasks)
+        sources.extend(chunk_sources)
+        targets.extend(chunk_targets)
+
+    if not (tasks or sources):
+        return CompactTaskGraph(array("i", [0]), array("i"))
+
+    lo = min(min(values) for values in (tasks, sources, targets) if values)
+    hi = max(max(values) for values in (tasks, sources, targets) if values)
+    span = hi - lo + 1
+
+    if span <= 4 * (len(tasks) + 2 * len(sources)):
+        present = bytearray(span)
+        for values in (tasks, sources, targets):
+            for x in values:
+                present[x - lo] = 1
+        n = present.count(1)
+
+        if n == span:
+            ids, base = None, lo
+            index_of = lambda x: x - lo
+        else:
+            rank = array("i", bytes(4 * span))
+            ids, base = array("q"), 0
+            for offset in compress(range(span), present):
+                rank[offset] = len(ids)
+                ids.append(lo + offset)
+            index_of = lambda x: rank[x - lo]
+    else:
+        ids = array("q", sorted(set(chain(tasks, sources, targets))))
+        n, base = len(ids), 0
+        index_of = lambda x: bisect_left(ids, x)
+
+    return CompactTaskGraph.from_edge_arrays(
+        n,
+        array("i", map(index_of, sources)),
+        array("i", map(index_of, targets)),
+        ids,
+        base,
+    )
+
+
+def _load_compact_numpy(chunks) -> CompactTaskGraph:
+    # Every id gets an index the first time it is seen (sorted known ids, and
+    # their arrival index), so the buffered edges are int32 arrival indices,
+    # relabeled in id order at the end. Blocks are mapped in batches of at
+    # least len(known) values, which keeps the inserts into known O(n log n)
+    # overall and the raw int64 ids held at once proportional to n, not e.
+    known = np.empty(0, np.int64)
+    arrival = np.empty(0, np.int32)
+    blocks, pending, pending_size = [], [], 0
+
+    def flush():
+        nonlocal known, arrival
+        values = np.concatenate(
+            [np.frombuffer(a, np.int64) for block in pending for a in block if a]
+            or [np.empty(0, np.int64)]
+        )
+        ids, local = np.unique(values, return_inverse=True)
+        at = np.searchsorted(known, ids)
+        new = at == len(known)
+        new[~new] = known[at[~new]] != ids[~new]
+        index = np.empty(len(ids), np.int32)
+        index[~new] = arrival[at[~new]]
+        index[new] = np.arange(len(known), len(known) + np.count_nonzero(new))
+        known = np.insert(known, at[new], ids[new])
+        arrival = np.insert(arrival, at[new], index[new])
+
+        local = index[local]
+        start = 0
+        for tasks, sources, targets in pending:
+            start += len(tasks)
+            e = len(sources)
+            blocks.append((local[start : start + e], local[start + e :][:e]))
+            start += 2 * e
+        pending.clear()
+
+    for block in chunks:
+        pending.append(block)
+        pending_size += sum(map(len, block))
+        if pending_size >= max(1 << 21, len(known)):
+            flush()
+            pending_size = 0
+    flush()
+
+    n = len(known)
+    if not n:
+        return CompactTaskGraph(array("i", [0]), array("i"))
+    rank = np.empty(n, np.int32)
+    rank[arrival] = np.arange(n, dtype=np.int32)
+    del arrival
+
+    # out-degrees, block by block
+    degree = np.zeros(n, np.int64)
+    for j, (sources, targets) in enumerate(blocks):
+        sources, targets = rank[sources], rank[targets]
+        np.add.at(degree, sources, 1)
+        blocks[j] = sources, targets
+    del rank
+
+    offsets = np.zeros(n + 1, np.int64)
+    np.cumsum(degree, out=offsets[1:])
+    del degree
+
+    # counting sort by source, keeping the input order per source
+    csr_targets = np.empty(int(offsets[-1]), np.int32)
+    fill = offsets[:-1].copy()
+    for j in range(len(blocks)):
+        sources, targets = blocks[j]
+        blocks[j] = None
+        if not len(sources):
+            continue
+        order = np.argsort(sources, kind="stable")
+        sources = sources[order]
+        run, first = _rank_in_runs(sources)
+        csr_targets[fill[sources] + run] = targets[order]
+        fill[sources[first]] += np.diff(np.r_[first, len(sources)])
+
+    if known[-1] - known[0] == n - 1:
+        task_ids, base = None, int(known[0])
+    else:
+        task_ids, base = array("q", known.tobytes()), 0
+    return CompactTaskGraph._from_buffers(
+        _int32_array(offsets), _int32_array(csr_targets), task_ids, base
+    )
+
+
+# Binary task graph file, little endian. A 64 byte header is followed by
+# 8 byte aligned sections: offsets (int32, n + 1), targets (int32, e), then
+# the optional ids (int64, n), labels (int32 alpha per task, n), and schedule
+# start and processor arrays (int32, n each) as listed in the header flags.
+TASK_GRAPH_MAGIC = b"CGTG"
+TASK_GRAPH_VERSION = 1
+_HEADER = struct.Struct("<4sIIIqqqq")
+_HEADER_SIZE = 64
+_HAS_IDS, _HAS_LABELS, _HAS_SCHEDULE = 1, 2, 4
+
+
+def _aligned(size):
+    return (size + 7) & ~7
+
+
+def save_task_graph(path, G: TaskGraph, L=None, schedule=None):
+    if sys.byteorder != "little":
+        raise ValueError("the binary task graph format is little endian only")
+    if not isinstance(G, CompactTaskGraph):
+        G = CompactTaskGraph.from_task_graph(G)
+    n = G.number_of_tasks()
+
+    flags = 0
+    ids = G._ids
+    if ids is not None:
+        flags |= _HAS_IDS
+
+    labels = None
+    if L is not None:
+        flags |= _HAS_LABELS
+        labels = array("i", bytes(4 * n))
+        for i, T in enumerate(L):
+            labels[G.index_of(T)] = n - i
+
+    start = processor = None
+    m = makespan = 0
+    if schedule is not None:
+        flags |= _HAS_SCHEDULE
+        m, makespan = len(schedule.processors), schedule.makespan
+        # list_schedule_csr schedules hold task indices, list_schedule task ids
+        index_of = (lambda T: T) if schedule.idle == -1 else G.index_of
+        start = array("i", bytes(4 * n))
+        processor = array("i", bytes(4 * n))
+        for p, slots in enumerate(schedule.processors):
+            for mu, T in enumerate(slots):
+                if T != schedule.idle:
+                    i = index_of(T)
+                    start[i] = mu
+                    processor[i] = p
+
+    with open(path, "wb") as f:
+        header = _HEADER.pack(
+            TASK_GRAPH_MAGIC,
+            TASK_GRAPH_VERSION,
+            flags,
+            m,
+            n,
+            G.number_of_edges(),
+            G._base,
+            makespan,
+        )
+        f.write(header.ljust(_HEADER_SIZE, b"\0"))
+        for section in (G.offsets, G.targets, ids, labels, start, processor):
+            if section is None:
+                continue
+            data = memoryview(section).cast("B")
+            f.write(data)
+            f.write(bytes(_aligned(len(data)) - len(data)))
+
+
+# An opened binary task graph. Every array is a memoryview into one read-only
+# mmap, so opening is O(1), pages are read on first touch, and processes that
+# open the same file share the page cache instead of holding copies.
+class TaskGraphFile:
+    def __init__(self, path):
+        if sys.byteorder != "little":
+            raise ValueError("the binary task graph format is little endian only")
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER_SIZE:
+            raise ValueError(f"{path} is not a task graph file")
+
+        magic, version, flags, m, n, e, base, makespan = _HEADER.unpack_from(self._mmap)
+        if magic != TASK_GRAPH_MAGIC:
+            raise ValueError(f"{path} is not a task graph file")
+        if version != TASK_GRAPH_VERSION:
+            raise ValueError(f"{path} has unsupported version {version}")
+
+        view = memoryview(self._mmap)
+        position = _HEADER_SIZE
+
+        def section(count, fmt, size):
+            nonlocal position
+            if count < 0 or position + count * size > len(self._mmap):
+                raise ValueError(f"{path} is truncated")
+            data = view[position : position + count * size].cast(fmt)
+            position += _aligned(count * size)
+            return data
+
+        offsets = section(n + 1, "i", 4)
+        targets = section(e, "i", 4)
+        ids = section(n, "q", 8) if flags & _HAS_IDS else None
+
+        self.graph = CompactTaskGraph._from_buffers(offsets, targets, ids, base)
+        self.labels = section(n, "i", 4) if flags & _HAS_LABELS else None
+        self.start = self.processor = None
+        self.m, self.makespan = m, makespan
+        if flags & _HAS_SCHEDULE:
+            self.start = section(n, "i", 4)
+            self.processor = section(n, "i", 4)
+
+    def L(self) -> list:
+        if self.labels is None:
+            raise ValueError("file has no labels")
+        order = [0] * len(self.labels)
+        for i, k in enumerate(self.labels):
+            order[len(order) - k] = self.graph.task_id(i)
+        return order
+
+    def schedule(self) -> Schedule:
+        if self.start is None:
+            raise ValueError("file has no schedule")
+        processors = [[None] * self.makespan for _ in range(self.m)]
+        start = {}
+        for i in range(self.graph.number_of_tasks()):
+            T = self.graph.task_id(i)
+            processors[self.processor[i]][self.start[i]] = T
+            start[T] = self.start[i]
+        return Schedule(processors, start, self.makespan)
+
+    def close(self):
+        # the views must go before the mmap can be closed
+        self.graph = self.labels = self.start = self.processor = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_task_graph(path) -> TaskGraphFile:
+    return TaskGraphFile(path)
+
+
+# Canonical content hash of G: the sorted task ids, then every task's sorted
+# successor ids, fed to blake2b as packed int64 buffers (no strings). The
+# order tasks were added in and the order of each successor list do not
+# matter. One pass over tasks and edges; only the per-list sorts run in C.
+def task_graph_key(G: TaskGraph, *params) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr(params).encode())
+
+    tasks = G.tasks() if isinstance(G, CompactTaskGraph) else sorted(G.tasks())
+    h.update(len(tasks).to_bytes(8, "little"))
+    h.update(array("q", tasks))
+    for T in tasks:
+        S_T = sorted(G.S(T))
+        h.update(len(S_T).to_bytes(8, "little"))
+        h.update(array("q", S_T))
+    return h.hexdigest()
+
+
+# Coffman-Graham schedules keyed by task_graph_key(G, m, reduce). Entries are
+# kept pickled, so max_bytes bounds the real size of the in-memory LRU tier
+# and a hit can never hand out an object an earlier caller modified. With a
+# directory, entries are also written there and looked up on a memory miss;
+# max_disk_bytes evicts the least recently used files.
+class ScheduleCache:
+    def __init__(self, max_bytes=64 << 20, directory=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pickle.loads(data)
+
+        if self.directory is not None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                os.utime(self._path(key))  # LRU order of the disk tier
+                self.disk_hits += 1
+                self._remember(key, data)
+                return pickle.loads(data)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, data)
+        if self.directory is not None:
+            tmp = self._path(key) + f".{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+            self._evict_disk()
+
+    def _remember(self, key, data):
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= len(old)
+            self.evictions += 1
+
+    def _evict_disk(self):
+        if self.max_disk_bytes is None:
+            return
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pickle"):
+                info = entry.stat()
+                files.append((info.st_mtime, info.st_size, entry.path))
+                total += info.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+            self.disk_evictions += 1
+
+    def schedule(self, G: TaskGraph, m=2, engine="sethi", reduce=False) -> Schedule:
+        key = task_graph_key(G, m, reduce)
+        schedule = self.get(key)
+        if schedule is None:
+            schedule = coffman_graham_schedule(G, m, engine, reduce)
+            self.put(key, schedule)
+        return schedule
+
+
+# Keeps a Coffman-Graham labeling up to date while G grows.
+#
+# Labels only increase along the run and every newly ready task has a larger
+# N(T) than all tasks already ready, so the chosen tasks come out sorted: after
+# the sinks, the order is the order of (N(T), T) with N(T) written in label
+# positions. Adding the edge u -> v only makes N(u) larger, so u can only move
+# later, which in turn can only make the N(T) of its predecessors larger, and
+# so on. A task whose position relative to the others did not change cannot
+# change any comparison, so only the predecessors of tasks that actually moved
+# are re-placed, in their old order (successors first), each by binary search
+# on (N(T), T) over the tasks that are not waiting to be re-placed.
+#
+# Positions are kept as gapped integer tags so a task can be inserted between
+# two others without renumbering; alpha(T) is the rank of T's tag.
+class IncrementalCoffmanGraham:
+    TAG_BITS = 32
+
+    def __init__(self, G: TaskGraph, engine="sethi"):
+        self.G = G
+        self.engine = engine
+        self._rebuild()
+
+    # Labels G from scratch.
+    def _rebuild(self):
+        self._order = coffman_graham(self.G, self.engine)[::-1]  # increasing alpha
+        self._tags = [i << self.TAG_BITS for i in range(len(self._order))]
+        self._tag = dict(zip(self._order, self._tags))
+        self._pending = []  # heap of (old tag, task) waiting to be re-placed
+
+    def L(self) -> list:
+        return self._order[::-1]
+
+    def alpha(self, T) -> int:
+        return bisect_left(self._tags, self._tag[T]) + 1
+
+    def _key(self, T):
+        return tuple(sorted([self._tag[t] for t in self.G.S(T)], reverse=True)), T
+
+    def _insert(self, i, T):
+        lo = self._tags[i - 1] if i > 0 else -(1 << self.TAG_BITS)
+        hi = self._tags[i] if i < len(self._tags) else lo + (2 << self.TAG_BITS)
+        if hi - lo < 2:
+            self._spread()
+            return self._insert(i, T)
+
+        tag = (lo + hi) // 2
+        self._order.insert(i, T)
+        self._tags.insert(i, tag)
+        self._tag[T] = tag
+
+    # Makes room between every pair of tags. Scaling keeps the order of all
+    # tags, including those of tasks waiting in the heap.
+    def _spread(self):
+        shift = self.TAG_BITS
+        self._tags = [t << shift for t in self._tags]
+        self._tag = {T: t << shift for T, t in self._tag.items()}
+        self._pending = [(t << shift, T) for t, T in self._pending]
+
+    def _remove(self, T):
+        i = bisect_left(self._tags, self._tag[T])
+        del self._order[i]
+        del self._tags[i]
+
+    # A new task is a sink; sinks come first, in increasing id order.
+    def add_task(self, tid=None):
+        tid = self.G.add_task(tid)
+        if tid not in self._tag:
+            sinks = len(self.G.sinks()) - 1
+            self._insert(bisect_left(self._order, tid, 0, sinks), tid)
+        return tid
+
+    def add_successor(self, predecessor, successor):
+        for T in (predecessor, successor):
+            if T not in self.G.tasks():
+                self.add_task(T)
+
+        # reject a cycle before G is touched; labels decrease along every edge,
+        # so only tasks labeled above the predecessor can lead back to it
+        if predecessor == successor:
+            raise InvalidTaskGraphError(cycle=[predecessor, predecessor])
+        floor = self._tag[predecessor]
+        reached_from = {successor: None}  # task -> the task whose S(T) reached it
+        frontier = [successor] if self._tag[successor] > floor else []
+        while frontier:
+            T = frontier.pop()
+            for t in self.G.S(T):
+                if t == predecessor:
+                    path = []
+                    while T is not None:
+                        path.append(T)
+                        T = reached_from[T]
+                    raise InvalidTaskGraphError(
+                        cycle=[predecessor, *path[::-1], predecessor]
+                    )
+                if t not in reached_from and self._tag[t] > floor:
+                    reached_from[t] = T
+                    frontier.append(t)
+
+        self.G.add_successor(predecessor, successor)
+        self.relabel(predecessor)
+
+    def relabel(self, T):
+        """Re-places T after its successor list grew, and whatever that moves."""
+        self._remove(T)
+        self._pending = [(self._tag[T], T)]
+        waiting = {T}
+        moved = 0
+        # past this many moved tasks a full run is cheaper than re-placing
+        budget = len(self._tag) // 256
+
+        while self._pending:
+            if moved > budget:
+                self._rebuild()
+                return len(self._order)
+
+            old_tag, T = heapq.heappop(self._pending)
+            waiting.discard(T)
+
+            sinks = len(self.G.sinks())
+            if not self.G.S(T):
+                i = bisect_left(self._order, T, 0, sinks)
+            else:
+                i = bisect_right(self._order, self._key(T), sinks, key=self._key)
+
+            if bisect_left(self._tags, old_tag) == i and (
+                i == len(self._tags) or self._tags[i] != old_tag
+            ):
+                # same neighbours as before, keep the tag, nothing else changes
+                self._order.insert(i, T)
+                self._tags.insert(i, old_tag)
+                continue
+
+            self._insert(i, T)
+            moved += 1
+            for p in self.G.P(T):
+                if p not in waiting:
+                    waiting.add(p)
+                    self._remove(p)
+                    heapq.heappush(self._pending, (self._tag[p], p))
+
+        return moved
+
+
 def generate_random_dag(num_nodes):
     """Generates a random connected TaskGraph (DAG) with a given number of nodes."""
     tasks = list(range(1, num_nodes + 1))
@@ -164,66 +2450,813 @@ def generate_random_dag(num_nodes):
     # Ensure connectivity (optional, but good for robust testing)
     # This basic generation ensures it's a DAG.
 
-    G = TaskGraph(tasks=tasks, successors=successors)
-
-    # A simple check to ensure no task is isolated (not always possible, but good try)
-    if num_nodes > 1:
-        all_nodes_connected = set(tasks)
-
-        # Check if every node has a predecessor or successor
-        has_connections = set()
-        for u in tasks:
-            if G.S(u):
-                has_connections.add(u)
-            for v_list in G._successors.values():
-                if u in v_list:
-                    has_connections.add(u)
-
+    return TaskGraph(tasks=tasks, successors=successors)
+
+
+# Vectorized generators, O(n + e) NumPy work and no per-task Python. Each family
+# takes (n, rng) with rng a numpy.random.Generator and returns parallel int64
+# arrays of (source, target) task indices in [0, n), always with
+# source < target, so every graph is a DAG.
+def _erdos_renyi_edges(n, rng, p=None, degree=4.0):
+    # each of the n(n-1)/2 pairs i < j is an edge with probability p; edge
+    # positions in the row-major upper triangle are drawn by geometric skips
+    pairs = n * (n - 1) // 2
+    if p is None:
+        p = 2 * degree / max(1, n - 1)
+    p = min(1.0, p)
+    if pairs == 0 or p <= 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+
+    expected = p * pairs
+    chunks = []
+    last = -1
+    while last < pairs - 1:
+        gaps = rng.geometric(p, int(expected + 5 * expected**0.5) + 16)
+        k = np.cumsum(gaps) + last
+        chunks.append(k)
+        last = int(k[-1])
+    k = np.concatenate(chunks)
+    k = k[: np.searchsorted(k, pairs)]
+
+    # row i starts at s(i) = i(2n - i - 1)/2, invert and fix float rounding
+    b = 2 * n - 1
+    i = ((b - np.sqrt(float(b) * b - 8.0 * k)) // 2).astype(np.int64)
+    i -= k < i * (b - i) // 2
+    i += k >= (i + 1) * (b - i - 1) // 2
+    j = k - i * (b - i) // 2 + i + 1
+    return i, j
+
+
+def _layered_edges(n, rng, width=None, degree=3):
+    # layers of `width` tasks, each task has up to `degree` distinct successors
+    # drawn from the next layer
+    width = width or max(1, int(n**0.5))
+    sources = np.arange(max(0, n - width), dtype=np.int64)
+    if not len(sources):
+        return sources, sources
+    first = (sources // width + 1) * width
+    size = np.minimum(width, n - first)
+    targets = first[:, None] + (rng.random((len(sources), degree)) * size[:, None])
+    targets = np.sort(targets.astype(np.int64), axis=1)
+    keep = np.ones(targets.shape, bool)
+    keep[:, 1:] = targets[:, 1:] != targets[:, :-1]
+    return np.repeat(sources, keep.sum(axis=1)), targets[keep]
+
+
+def _in_tree_edges(n, rng):
+    # every task but the last has one successor, uniform among the later ones
+    sources = np.arange(n - 1, dtype=np.int64)
+    return sources, rng.integers(sources + 1, n)
+
+
+def _out_tree_edges(n, rng):
+    # every task but the first has one predecessor, uniform among the earlier
+    targets = np.arange(1, n, dtype=np.int64)
+    return rng.integers(0, targets), targets
+
+
+def _series_parallel_edges(n, rng, max_width=8, max_length=4):
+    # a series of blocks join -> (1..max_width parallel chains of 1..max_length
+    # tasks) -> next join; with max_length=1 this is fork-join
+    mean = (1 + max_length) / 2 + 2 / (1 + max_width)
+    count = int(n / mean * 1.1) + 16
+    while True:
+        lengths = rng.integers(1, max_length + 1, count)
+        widths = rng.integers(1, max_width + 1, count)
+        blocks = int(np.searchsorted(np.cumsum(widths), count)) + 1
+        block = np.repeat(np.arange(blocks), widths[:blocks])[:count]
+        sizes = 1 + np.bincount(block, lengths, minlength=blocks).astype(np.int64)
+        if sizes.sum() >= n:
+            break
+        count *= 2
+
+    join = np.cumsum(sizes) - sizes
+    before = np.cumsum(lengths) - lengths  # tasks in earlier chains
+    first_chain = np.searchsorted(block, np.arange(blocks))
+    head = join[block] + 1 + before - before[first_chain[block]]
+    tail = head + lengths - 1
+    next_join = join[block] + sizes[block]
+
+    chain_tasks = np.repeat(head, lengths) + (
+        np.arange(lengths.sum()) - np.repeat(before, lengths)
+    )
+    inner = np.ones(len(chain_tasks), bool)
+    inner[np.cumsum(lengths) - 1] = False
+
+    sources = np.concatenate([join[block], chain_tasks[inner], tail])
+    targets = np.concatenate([head, chain_tasks[inner] + 1, next_join])
+    keep = targets < n
+    return sources[keep], targets[keep]
+
+
+def _fork_join_edges(n, rng, width=16):
+    return _series_parallel_edges(n, rng, max_width=width, max_length=1)
+
+
+COMPACT_DAG_FAMILIES = {
+    "erdos_renyi": _erdos_renyi_edges,
+    "layered": _layered_edges,
+    "in_tree": _in_tree_edges,
+    "out_tree": _out_tree_edges,
+    "series_parallel": _series_parallel_edges,
+    "fork_join": _fork_join_edges,
+}
+
+
+def _int32_array(values) -> array:
+    a = array("i")
+    a.frombytes(np.ascontiguousarray(values, dtype=np.int32).tobytes())
+    return a
+
+
+# A random DAG on tasks 1..n straight into CSR form. The same seed gives the
+# same graph. Needs NumPy; 10^7 tasks take a few seconds.
+def random_compact_dag(family, n, seed=None, **params) -> CompactTaskGraph:
+    if np is None:
+        raise ImportError("random_compact_dag requires numpy")
+    if family not in COMPACT_DAG_FAMILIES:
+        raise ValueError(
+            f"Unknown family {family!r}, expected one of {sorted(COMPACT_DAG_FAMILIES)}"
+        )
+
+    rng = np.random.default_rng(seed)
+    sources, targets = COMPACT_DAG_FAMILIES[family](n, rng, **params)
+    if len(sources) > 1 and (np.diff(sources) < 0).any():
+        order = np.argsort(sources, kind="stable")
+        sources, targets = sources[order], targets[order]
+
+    offsets = np.zeros(n + 1, np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+
+    G = CompactTaskGraph._from_buffers(_int32_array(offsets), _int32_array(targets), base=1)
+    G._validated = True  # every edge goes from a smaller to a larger index
     return G
 
 
-def coffman_graham_algorithm_runtime_tests():
-    print("## ⏱️ Coffman-Graham Algorithm Runtime Tests")
+# Graph families for the benchmark, each building a DAG on tasks 1..n from a
+# seeded random.Random, with O(n) edges unless noted, so every family scales to
+# 10^6 tasks. Edges always go from a smaller to a larger id. The families
+# random_compact_dag also makes are taken from it, so a family name means the
+# same distribution everywhere; those need NumPy.
+def _sparse_dag(n, rng, degree=4):
+    successors = {}
+    for i in range(1, n):
+        span = n - i
+        successors[i] = list({i + rng.randint(1, span) for _ in range(min(degree, span))})
+    return successors
+
+
+def _dense_dag(n, rng, p=0.2):
+    # the generate_random_dag family, O(n^2) edges
+    return {
+        i: [j for j in range(i + 1, n + 1) if rng.random() < p] for i in range(1, n)
+    }
+
+
+def _chain_dag(n, rng):
+    return {i: [i + 1] for i in range(1, n)}
+
+
+def _compact_dag(family):
+    def successors(n, rng):
+        G = random_compact_dag(family, n, seed=rng.getrandbits(64))
+        offsets, heads = G.offsets, [t + 1 for t in G.targets]
+        return {i + 1: heads[offsets[i] : offsets[i + 1]] for i in range(n)}
+
+    return successors
+
+
+BENCHMARK_FAMILIES = {
+    "sparse": _sparse_dag,
+    "dense": _dense_dag,
+    "chain": _chain_dag,
+    "independent": lambda n, rng: {},
+}
+if np is not None:
+    BENCHMARK_FAMILIES.update(
+        (family, _compact_dag(family)) for family in COMPACT_DAG_FAMILIES
+    )
+
+# Largest n each family / engine is run at by default; beyond these a single
+# run takes minutes (O(n^2) edges, or the reference engine's O(n^2) scans).
+BENCHMARK_LIMITS = {"dense": 5000, "reference": 2000}
+
+
+def benchmark_task_graph(family, n, seed=0) -> TaskGraph:
+    if family not in BENCHMARK_FAMILIES:
+        raise ValueError(
+            f"Unknown family {family!r}, expected one of {sorted(BENCHMARK_FAMILIES)}"
+        )
+    rng = random.Random(f"{family}:{n}:{seed}")
+    return TaskGraph(
+        tasks=range(1, n + 1), successors=BENCHMARK_FAMILIES[family](n, rng)
+    )
+
+
+# name -> (prepare, run). prepare is not timed.
+BENCHMARK_ENGINES = {
+    "reference": (None, coffman_graham_algorithm),
+    "sethi": (None, coffman_graham_algorithm_sethi),
+    "compact": (CompactTaskGraph.from_task_graph, coffman_graham_algorithm_sethi),
+}
+
+
+def _percentile(sorted_values, q):
+    # nearest rank
+    k = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * q // 100) - 1))
+    return sorted_values[int(k)]
+
+
+def _benchmark_one(G, engine, repeat, warmup, memory):
+    prepare, run = BENCHMARK_ENGINES[engine]
+    if prepare is not None:
+        G = prepare(G)
+
+    for _ in range(warmup):
+        run(G)
+
+    times = []
+    failures = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            run(G)
+        except ValueError:
+            failures += 1
+            continue
+        times.append(time.perf_counter() - start)
+    times.sort()
+
+    record = {
+        "runs": len(times),
+        "failures": failures,
+        "median": _percentile(times, 50) if times else None,
+        "p95": _percentile(times, 95) if times else None,
+        "min": times[0] if times else None,
+    }
+    if memory:
+        # a separate traced run, tracemalloc slows everything it watches
+        tracemalloc.start()
+        try:
+            run(G)
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        except ValueError:
+            record["peak_bytes"] = None
+        finally:
+            tracemalloc.stop()
+    return record
+
+
+# Times every engine on every family at every size. Failed runs are counted
+# but never timed. Returns a JSON-serialisable report; see compare_benchmarks.
+def coffman_graham_benchmark(
+    families=None,
+    sizes=(10, 100, 1000, 10**4, 10**5, 10**6),
+    engines=None,
+    repeat=5,
+    warmup=1,
+    seed=0,
+    memory=True,
+    limits=BENCHMARK_LIMITS,
+    progress=None,
+) -> dict:
+    families = list(families or BENCHMARK_FAMILIES)
+    engines = list(engines or BENCHMARK_ENGINES)
+    for engine in engines:
+        if engine not in BENCHMARK_ENGINES:
+            raise ValueError(
+                f"Unknown engine {engine!r}, expected one of {sorted(BENCHMARK_ENGINES)}"
+            )
 
-    # Define the input sizes (number of tasks)
-    input_sizes = [10, 50, 100, 500, 1000, 2000]
     results = []
-
-    print("| Number of Tasks (n) | Avg. Runtime (s) |")
-    print("| :------------------ | :--------------- |")
-
-    for n in input_sizes:
-        # Run multiple trials for a more stable average measurement
-        num_trials = 5
-        total_time = 0
-
-        for _ in range(num_trials):
-            # 1. Generate a random Task Graph (DAG) of size n
-            
-            G = generate_random_dag(n)
-
-            # 2. Measure the execution time
-            start_time = time.perf_counter()
-            try:
-                coffman_graham_algorithm(G)
-            except ValueError as e:
-                # Catch the ValueError for "G is not a valid task graph"
-                # though it shouldn't happen with the DAG generator
-                print(f"Error for n={n}: {e}")
+    for family in families:
+        for n in sizes:
+            if n > limits.get(family, n):
                 continue
-            end_time = time.perf_counter()
+            G = benchmark_task_graph(family, n, seed)
+            edges = sum(map(G.out_degree, G.tasks()))
+            for engine in engines:
+                if n > limits.get(engine, n):
+                    continue
+                record = {"family": family, "n": n, "edges": edges, "engine": engine}
+                record.update(_benchmark_one(G, engine, repeat, warmup, memory))
+                results.append(record)
+                if progress is not None:
+                    progress(record)
+
+    return {
+        "version": 1,
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "config": {
+            "families": families,
+            "sizes": list(sizes),
+            "engines": engines,
+            "repeat": repeat,
+            "warmup": warmup,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+# Makespan of the Coffman-Graham list schedule (from `engine`'s L) against
+# optimal_schedule on small graphs of every family. gap is the number of
+# extra steps, 0 when Coffman-Graham is optimal.
+def optimality_gaps(
+    families=None, sizes=(10, 20, 30, 40), processors=(2, 3, 4), seeds=range(5),
+    engine="reference", progress=None,
+) -> list:
+    records = []
+    for family in families or BENCHMARK_FAMILIES:
+        for n in sizes:
+            for seed in seeds:
+                G = benchmark_task_graph(family, n, seed)
+                L = coffman_graham(G, engine)
+                for m in processors:
+                    makespan = list_schedule(G, L, m).makespan
+                    start = time.perf_counter()
+                    optimal = optimal_schedule(G, m).makespan
+                    record = {
+                        "family": family,
+                        "n": n,
+                        "m": m,
+                        "seed": seed,
+                        "makespan": makespan,
+                        "optimal": optimal,
+                        "gap": makespan - optimal,
+                        "ratio": makespan / optimal if optimal else 1.0,
+                        "solve_time": time.perf_counter() - start,
+                    }
+                    records.append(record)
+                    if progress is not None:
+                        progress(record)
+    return records
+
+
+# Results of `current` whose median time (or peak memory) is more than
+# `threshold` above the same family / n / engine in `baseline`.
+def compare_benchmarks(current: dict, baseline: dict, threshold=0.10) -> list:
+    def key(r):
+        return r["family"], r["n"], r["engine"]
+
+    before = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        b = before.get(key(r))
+        if b is None:
+            continue
+        for metric in ("median", "peak_bytes"):
+            new, old = r.get(metric), b.get(metric)
+            if new is None or not old:
+                continue
+            if new > old * (1 + threshold):
+                regressions.append(
+                    {
+                        "family": r["family"],
+                        "n": r["n"],
+                        "engine": r["engine"],
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "ratio": new / old,
+                    }
+                )
+    return regressions
+
+
+def _format_benchmark_record(r):
+    median = "failed" if r["median"] is None else f"{r['median']:.6f}"
+    p95 = "-" if r["p95"] is None else f"{r['p95']:.6f}"
+    peak = r.get("peak_bytes")
+    peak = "-" if peak is None else f"{peak / 1024:.0f}"
+    return (
+        f"{r['family']:<15} {r['n']:>8} {r['edges']:>9} {r['engine']:<10}"
+        f" {median:>10} {p95:>10} {peak:>10}"
+    )
+
+
+def benchmark_main(argv=None):
+    import argparse
+
+    def int_list(s):
+        return [int(float(x)) for x in s.split(",")]
+
+    def name_list(s):
+        return s.split(",")
+
+    parser = argparse.ArgumentParser(description="Coffman-Graham benchmarks")
+    parser.add_argument("--families", type=name_list, default=None)
+    parser.add_argument(
+        "--sizes", type=int_list, default=[10, 100, 1000, 10**4, 10**5, 10**6]
+    )
+    parser.add_argument("--engines", type=name_list, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--baseline", help="report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument(
+        "--gaps", action="store_true", help="also report optimality gaps"
+    )
+    parser.add_argument("--processors", type=int_list, default=[2, 3, 4])
+    parser.add_argument(
+        "--gap-sizes",
+        type=int_list,
+        default=[10, 20, 30, 40],
+        help="graph sizes for --gaps, solved exactly so keep them small",
+    )
+    parser.add_argument(
+        "--gap-seeds", type=int, default=5, help="graphs per family and size"
+    )
+    parser.add_argument(
+        "--gap-engine", choices=sorted(COFFMAN_GRAHAM_ENGINES), default="reference"
+    )
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'family':<15} {'n':>8} {'edges':>9} {'engine':<10}"
+        f" {'median s':>10} {'p95 s':>10} {'peak KiB':>10}",
+        file=sys.stderr,
+    )
+    report = coffman_graham_benchmark(
+        families=args.families,
+        sizes=args.sizes,
+        engines=args.engines,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        seed=args.seed,
+        memory=not args.no_memory,
+        progress=lambda r: print(_format_benchmark_record(r), file=sys.stderr),
+    )
+
+    if args.gaps:
+        report["gaps"] = optimality_gaps(
+            families=args.families,
+            sizes=args.gap_sizes,
+            processors=args.processors,
+            seeds=range(args.seed, args.seed + args.gap_seeds),
+            engine=args.gap_engine,
+        )
+        worst = {}
+        for r in report["gaps"]:
+            key = r["family"], r["m"]
+            worst[key] = max(worst.get(key, 0), r["gap"])
+        for (family, m), gap in worst.items():
+            print(f"gap {family:<15} m={m} worst {gap}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_benchmarks(report, baseline, args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['family']} n={r['n']} {r['engine']} {r['metric']}:"
+                f" {r['baseline']:.6g} -> {r['current']:.6g} ({r['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+# cg-schedule: loads an edge list (streamed, straight into CSR form), labels it
+# and writes one row per task as the list schedule reaches it, so the output
+# is never held in memory. Rows are task, label (alpha), step, processor
+# (0-based), as CSV or as JSON lines.
+def schedule_main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="cg-schedule", description="Coffman-Graham schedule of an edge list"
+    )
+    parser.add_argument("graph", nargs="?", default="-", help="edge list, - for stdin")
+    parser.add_argument("-m", "--processors", type=int, default=2)
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--input-format", choices=EDGE_LIST_FORMATS, default=None)
+    parser.add_argument(
+        "--engine", choices=sorted(COFFMAN_GRAHAM_ENGINES), default="sethi"
+    )
+    args = parser.parse_args(argv)
+    if args.processors < 1:
+        parser.error("--processors must be at least 1")
+
+    try:
+        G = load_compact_task_graph(args.graph, args.input_format)
+        if not len(G):
+            return 0
+        validate_task_graph(G)
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"cg-schedule: {e}\n")
+    if args.engine == "sethi":
+        order = coffman_graham_order_csr(G.offsets, G.targets)
+    else:
+        order = array("i", map(G.index_of, reversed(coffman_graham(G, args.engine))))
+
+    alpha = array("i", bytes(4 * len(order)))
+    for k, i in enumerate(order, 1):
+        alpha[i] = k
+    order.reverse()  # L
+
+    task_id = G.task_id
+    write = sys.stdout.write
+    try:
+        if args.format == "csv":
+            write("task,label,step,processor\n")
+        steps = iter_list_schedule_csr(G.offsets, G.targets, order, args.processors)
+        for mu, running in enumerate(steps):
+            for p, i in enumerate(running):
+                if args.format == "csv":
+                    write(f"{task_id(i)},{alpha[i]},{mu},{p}\n")
+                else:
+                    write(
+                        f'{{"task": {task_id(i)}, "label": {alpha[i]},'
+                        f' "step": {mu}, "processor": {p}}}\n'
+                    )
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # the reader went away (e.g. | head), nothing left to do
+        sys.stdout = open(os.devnull, "w")
+    return 0
+
+
+def _incremental_L(G: TaskGraph) -> list:
+    H = IncrementalCoffmanGraham(TaskGraph(tasks=G.tasks()))
+    for T in G.tasks():
+        for t in G.S(T):
+            H.add_successor(T, t)
+    return H.L()
+
+
+def _steps_L(G: TaskGraph) -> list:
+    step = None
+    for step in coffman_graham_steps(G):
+        pass
+    return step.partial
+
+
+# coffman_graham_batch on a mixed batch: G as a TaskGraph and again as a
+# CompactTaskGraph. Two different labelings come back as a pair, which no
+# other engine gives.
+def _batch_L(G: TaskGraph) -> list:
+    B = coffman_graham_batch([G, CompactTaskGraph.from_task_graph(G)])
+    L = B.L(0)
+    return L if B.L(1) == L else [L, B.L(1)]
+
+
+# Extra ways of computing L checked by fuzz_engines on top of every engine in
+# COFFMAN_GRAHAM_ENGINES.
+FUZZ_ENGINES = {
+    "csr": lambda G: coffman_graham_algorithm_sethi(CompactTaskGraph.from_task_graph(G)),
+    "steps": _steps_L,
+    "parallel": lambda G: coffman_graham_parallel(G, workers=1, min_job_size=1),
+    "incremental": _incremental_L,
+    "batch": _batch_L,
+}
+
+
+def _fuzz_engines(names=None) -> dict:
+    engines = dict(COFFMAN_GRAHAM_ENGINES, **FUZZ_ENGINES)
+    if names is None:
+        return engines
+    for name in names:
+        if name not in engines:
+            raise ValueError(f"Unknown engine {name!r}, expected one of {sorted(engines)}")
+    return {name: engines[name] for name in names}
+
+
+# Random DAG for seed: sparse non-contiguous ids, edges along a random
+# topological order (so ids say nothing about the structure), and densities
+# from empty to half of all pairs.
+def _fuzz_graph(seed, max_tasks):
+    rng = random.Random(seed)
+    n = rng.randint(1, max_tasks)
+    ids = sorted(rng.sample(range(1, 4 * max_tasks + 1), n))
+    order = ids[:]
+    rng.shuffle(order)
+    p = rng.random() * 0.5
+    successors = {
+        order[i]: [order[j] for j in range(i + 1, n) if rng.random() < p]
+        for i in range(n)
+    }
+    return ids, successors
+
+
+def _fuzz_outcomes(tasks, successors, engines) -> dict:
+    outcomes = {}
+    for name, engine in engines.items():
+        G = TaskGraph(tasks=tasks, successors=successors)
+        try:
+            outcomes[name] = list(engine(G))
+        except Exception as e:
+            outcomes[name] = f"{type(e).__name__}: {e}"
+    return outcomes
+
+
+def _fuzz_differs(outcomes) -> bool:
+    expected = next(iter(outcomes.values()))
+    return any(result != expected for result in outcomes.values())
+
+
+def _fuzz_chunk(job) -> list:
+    start, stop, names, max_tasks = job
+    engines = _fuzz_engines(names)
+    failures = []
+    for seed in range(start, stop):
+        tasks, successors = _fuzz_graph(seed, max_tasks)
+        if _fuzz_differs(_fuzz_outcomes(tasks, successors, engines)):
+            failures.append((seed, tasks, successors))
+    return failures
+
+
+# Greedy shrinking: drop tasks, then edges, one at a time while the engines
+# still disagree, then renumber the survivors 1..k in id order.
+def shrink_counterexample(tasks, successors, engines=None):
+    engines = _fuzz_engines(engines)
+
+    def fails(tasks, successors):
+        return _fuzz_differs(_fuzz_outcomes(tasks, successors, engines))
+
+    tasks = list(tasks)
+    successors = {T: list(successors.get(T, ())) for T in tasks}
+    changed = True
+    while changed:
+        changed = False
+        for T in list(tasks):
+            kept = [t for t in tasks if t != T]
+            edges = {u: [v for v in successors[u] if v != T] for u in kept}
+            if kept and fails(kept, edges):
+                tasks, successors, changed = kept, edges, True
+        for u in tasks:
+            for v in list(successors[u]):
+                edges = dict(successors)
+                edges[u] = [t for t in successors[u] if t != v]
+                if fails(tasks, edges):
+                    successors, changed = edges, True
 
-            total_time += end_time - start_time
+    rename = {T: i for i, T in enumerate(tasks, 1)}
+    renamed = {rename[u]: [rename[v] for v in successors[u]] for u in tasks}
+    if fails(list(rename.values()), renamed):
+        return list(rename.values()), renamed
+    return tasks, successors
 
-        # Calculate and store the average runtime
-        avg_time = total_time / num_trials
-        results.append((n, avg_time))
 
-        # Print the result immediately for real-time tracking
-        print(f"| {n} | {avg_time:.6f} |")
+# Regression fixtures are JSON files holding the graph and the reference L.
+# FUZZ_FIXTURES holds the checked-in ones, which --replay runs by default.
+FUZZ_FIXTURES = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "fuzz-fixtures"
+)
 
-    print("\n---")
-    print("Tests complete.")
+
+def save_fuzz_fixture(directory, tasks, successors, seed=None) -> str:
+    os.makedirs(directory, exist_ok=True)
+    G = TaskGraph(tasks=tasks, successors=successors)
+    path = os.path.join(directory, f"fuzz-{task_graph_key(G)[:16]}.json")
+    fixture = {
+        "seed": seed,
+        "tasks": list(tasks),
+        "successors": [[T, list(successors.get(T, ()))] for T in tasks],
+        "expected": _fuzz_outcomes(tasks, successors, {"reference": coffman_graham_algorithm})["reference"],
+    }
+    with open(path, "w") as f:
+        json.dump(fixture, f)
+    return path
+
+
+# A fixture with an "edge_list" (text in "format") must also load back as its
+# graph through both edge list loaders.
+def _fixture_loads(fixture, successors) -> bool:
+    text = fixture["edge_list"].encode()
+    expected = sorted(fixture["tasks"]), sorted(
+        (T, t) for T, S_T in successors.items() for t in S_T
+    )
+    for load in (load_task_graph, load_compact_task_graph):
+        G = load(io.BytesIO(text), fixture.get("format"))
+        edges = sorted((T, t) for T in G.tasks() for t in G.S(T))
+        if (sorted(G.tasks()), edges) != expected:
+            return False
+    return True
+
+
+# Paths of the fixtures in `directory` some engine (or loader) gets wrong.
+def replay_fuzz_fixtures(directory, engines=None) -> list:
+    engines = _fuzz_engines(engines)
+    failing = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        with open(path) as f:
+            fixture = json.load(f)
+        successors = dict((T, S_T) for T, S_T in fixture["successors"])
+        if "edge_list" in fixture and not _fixture_loads(fixture, successors):
+            failing.append(path)
+            continue
+        outcomes = _fuzz_outcomes(fixture["tasks"], successors, engines)
+        if any(result != fixture["expected"] for result in outcomes.values()):
+            failing.append(path)
+    return failing
+
+
+# Differential fuzzing: runs seeds [seed, seed + count) through every engine
+# and compares each L with the first engine's (the reference by default).
+# Seeds are split in chunks over a process pool. Disagreements are shrunk and,
+# with `fixtures`, saved there for replay_fuzz_fixtures.
+def fuzz_engines(
+    count=10000, seed=0, engines=None, max_tasks=24, workers=None, fixtures=None,
+    chunk_size=500,
+) -> dict:
+    names = list(_fuzz_engines(engines))
+    jobs = [
+        (start, min(start + chunk_size, seed + count), names, max_tasks)
+        for start in range(seed, seed + count, chunk_size)
+    ]
+
+    started = time.perf_counter()
+    if len(jobs) <= 1 or workers == 1:
+        results = map(_fuzz_chunk, jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_fuzz_chunk, jobs)
+
+    failures = []
+    try:
+        for chunk in results:
+            for failed_seed, tasks, successors in chunk:
+                tasks, successors = shrink_counterexample(tasks, successors, names)
+                failure = {
+                    "seed": failed_seed,
+                    "tasks": tasks,
+                    "successors": successors,
+                    "outcomes": _fuzz_outcomes(tasks, successors, _fuzz_engines(names)),
+                }
+                if fixtures is not None:
+                    failure["fixture"] = save_fuzz_fixture(
+                        fixtures, tasks, successors, failed_seed
+                    )
+                failures.append(failure)
+    finally:
+        if len(jobs) > 1 and workers != 1:
+            pool.shutdown()
+
+    seconds = time.perf_counter() - started
+    return {
+        "graphs": count,
+        "engines": names,
+        "seconds": seconds,
+        "graphs_per_second": count / seconds if seconds else None,
+        "failures": failures,
+    }
+
+
+def fuzz_main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Differential engine fuzzing")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-tasks", type=int, default=24)
+    parser.add_argument("--engines", type=lambda s: s.split(","), default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--fixtures", help="save shrunk counterexamples here")
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help=f"only rerun the saved fixtures (--fixtures, default {FUZZ_FIXTURES})",
+    )
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        fixtures = args.fixtures or FUZZ_FIXTURES
+        if not os.path.isdir(fixtures):
+            parser.error(f"--replay needs --fixtures, {fixtures} is not a directory")
+        failing = replay_fuzz_fixtures(fixtures, args.engines)
+        for path in failing:
+            print(f"FAIL {path}", file=sys.stderr)
+        return 1 if failing else 0
+
+    report = fuzz_engines(
+        count=args.count,
+        seed=args.seed,
+        engines=args.engines,
+        max_tasks=args.max_tasks,
+        workers=args.workers,
+        fixtures=args.fixtures,
+    )
+    print(
+        f"{report['graphs']} graphs x {len(report['engines'])} engines"
+        f" in {report['seconds']:.2f}s ({report['graphs_per_second']:.0f}/s),"
+        f" {len(report['failures'])} failures",
+        file=sys.stderr,
+    )
+    for failure in report["failures"]:
+        print(json.dumps(failure), file=sys.stderr)
+    return 1 if report["failures"] else 0
 
 
 if __name__ == "__main__":
@@ -300,4 +3333,8 @@ if __name__ == "__main__":
     # G3.print_DAG()
     # L3 = coffman_graham_algorithm(G3)
     # print(f"L: {L3}")
-    coffman_graham_algorithm_runtime_tests()
+    if sys.argv[1:2] == ["fuzz"]:
+        sys.exit(fuzz_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["schedule"]:
+        sys.exit(schedule_main(sys.argv[2:]))
+    sys.exit(benchmark_main())